@@ -1,3 +1,14 @@
 # process_agents/__init__.py
+import pkgutil
+import google
+import google.adk
+
+# Extend the google namespace once, when the package is first imported, rather
+# than in each module that needs it
+if not getattr(google, "_path_extended", False):
+    google.__path__ = pkgutil.extend_path(google.__path__, google.__name__)
+    google.adk.__path__ = pkgutil.extend_path(google.adk.__path__, google.adk.__name__)
+    google._path_extended = True
+
 # from .agent import root_agent
 #__all__ = ["root_agent"]
@@ -3,19 +3,18 @@
 import os
 import signal
 import sys
+import atexit
+import importlib
+import queue
+import threading
 import logging
-from datetime import datetime
+import logging.handlers
+import time
 from dotenv import load_dotenv
-import pkgutil
-import google
-import google.adk
-from google.adk.agents import LoopAgent, SequentialAgent, LlmAgent
-
-google.__path__ = pkgutil.extend_path(google.__path__, google.__name__)
-google.adk.__path__ = pkgutil.extend_path(google.adk.__path__, google.adk.__name__)
 
 from .utils import (
     load_instruction,
+    prefetch_instructions,
     validate_instruction_files,
     getProperty,
     getResponseColour,
@@ -46,48 +45,92 @@ else:
 # ---------------------------------------------------------
 log_dir = "output/logs"
 os.makedirs(log_dir, exist_ok=True)
-log_file = os.path.join(log_dir, f"pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
-log_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler = logging.FileHandler(log_file)
-file_handler.setFormatter(log_format)
-file_handler.flush = lambda: file_handler.stream.flush()
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setFormatter(log_format)
-logger = logging.getLogger("ProcessArchitect")
-logger.addHandler(file_handler)
-logger.propagate = False
-logging.getLogger("google_adk.google.adk.agents.llm_agent").setLevel(logging.ERROR)
-
-LOGLEVEL = getProperty("LOGLEVEL")
-if LOGLEVEL not in ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]:
-    LOGLEVEL = "WARNING"
-logger.setLevel(LOGLEVEL)
+
+_log_listener = None
+_log_buffer = None
+_runtime_stream = None
+_log_flusher_stop = threading.Event()
+
+
+def setup_logging() -> logging.Logger:
+    """
+    Configures the ProcessArchitect logger; a second call returns it unchanged.
+    Log calls only enqueue the record: a background QueueListener thread owns the
+    buffered file handler, so the event loop never waits on disk writes. A daemon
+    thread flushes that buffer periodically, so this also holds under `adk run` and
+    `adk web`, which never go through run_cli.
+    """
+    global _log_listener, _log_buffer
+    logger = logging.getLogger("ProcessArchitect")
+    if logger.handlers:
+        return logger
+
+    log_file = os.path.join(log_dir, f"pipeline_{time.strftime('%Y%m%d_%H%M%S')}.log")
+    log_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    # delay=True: the log file is only created once the first record is written,
+    # so importing the module (or running --help) does not leave empty logs behind
+    file_handler = logging.FileHandler(log_file, delay=True)
+    file_handler.setFormatter(log_format)
+    # Buffer records and write them in batches; errors flush immediately and
+    # logging.shutdown() drains whatever is left at exit
+    memory_handler = logging.handlers.MemoryHandler(
+        capacity=256, flushLevel=logging.ERROR, target=file_handler
+    )
+    _log_buffer = memory_handler
+    log_queue = queue.SimpleQueue()
+    _log_listener = logging.handlers.QueueListener(log_queue, memory_handler, respect_handler_level=True)
+    _log_listener.start()
+    threading.Thread(target=_log_flusher, name="ProcessArchitect-log-flusher", daemon=True).start()
+    atexit.register(stop_logging)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.propagate = False
+    logging.getLogger("google_adk.google.adk.agents.llm_agent").setLevel(logging.ERROR)
+
+    level = getProperty("LOGLEVEL")
+    if level not in ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]:
+        level = "WARNING"
+    logger.setLevel(level)
+    return logger
+
+def stop_logging():
+    """Drains the log queue and stops the listener thread; safe to call more than once."""
+    global _log_listener
+    _log_flusher_stop.set()
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+def flush_logs():
+    """Writes any buffered log records (and redirected stderr output) to disk now."""
+    if _log_buffer is not None:
+        _log_buffer.flush()
+    if _runtime_stream is not None and not _runtime_stream.closed:
+        _runtime_stream.flush()
+
+def _log_flusher(interval: float = 1.0):
+    """Flushes the log buffer periodically so a quiet run still reaches disk within `interval` seconds."""
+    while not _log_flusher_stop.wait(interval):
+        flush_logs()
+
+logger = setup_logging()
+
+# Pacing intervals, resolved once rather than on every instruction
+MODEL_SLEEP = getProperty("modelSleep", default=0.5, cast=float)
+SHELL_SLEEP = getProperty("modelSleep", default=0.25, cast=float)
 
 runtime_file = os.path.join(log_dir, "runtime_errors.log")
-if os.path.exists(runtime_file):
+# Redirect stderr once per process. Mode "w" starts each run with an empty log
+# (truncating in place, so a `tail -f` on it keeps working). Writes are collected in
+# a 64 KiB buffer rather than hitting the disk per line; the periodic log flusher,
+# the signal handler and interpreter exit all flush it
+if not getattr(sys, "_runtime_redirected", False):
     try:
-        os.remove(runtime_file)
-    except Exception as e:
-        logger.error(f"Failed to remove runtime file: {str(e)}")
-sys.stderr = open(runtime_file, "a")
-
-# Import sub-agents
-from .agent_registry import (
-    full_design_pipeline,
-    consultant_agent,
-    scenario_tester_agent,
-    update_design_pipeline,
-    simulation_query_agent,
-    build_doc_creation_agent,
-    SubprocessDriverAgent,
-)
-
-# Validate instruction files before proceeding
-logger.debug("Validating instruction files...")
-if not validate_instruction_files():
-    logger.error("Instruction file validation failed. Aborting pipeline.")
-    sys.exit(1)
-logger.debug("Pipeline initialised...")
+        _runtime_stream = open(runtime_file, "w", buffering=1 << 16, encoding="utf-8")
+        sys.stderr = _runtime_stream
+        sys._runtime_redirected = True
+        atexit.register(flush_logs)
+    except OSError as e:
+        logger.error(f"Failed to open runtime file: {str(e)}")
 
 # Signal handler for abnormal errors
 def handler(signum, frame):
@@ -95,89 +138,256 @@ def handler(signum, frame):
     sys.stdout = sys.__stdout__
     sys.stdout.flush()
     print(f"\n{ANSI_RED} - Received signal {signame} ({signum}). Terminating Process Architect Orchestrator.{ANSI_RESET}", end="\n")
+    flush_logs()  # drain buffered stderr output before switching back
     sys.stderr = sys.__stderr__
     sys.stderr.flush()
     logger.warning("Trapped signal %d", signum)
+    stop_logging()
+    flush_logs()
     sys.exit(1)
 
-signal.signal(signal.SIGBUS, handler)
-signal.signal(signal.SIGABRT, handler)
-signal.signal(signal.SIGILL, handler)
-signal.signal(signal.SIGTERM, handler)
+_signals_installed = False
+
+def install_signal_handlers():
+    """Registers the termination handler once per process."""
+    global _signals_installed
+    if _signals_installed:
+        return
+    for sig in (signal.SIGBUS, signal.SIGABRT, signal.SIGILL, signal.SIGTERM):
+        signal.signal(sig, handler)
+    _signals_installed = True
+
+install_signal_handlers()
 
 # ---------------------------------------------------------
 # ROOT AGENT
 # ---------------------------------------------------------
-from .agent_wrappers import ProcessLlmAgent  # DefaultLlmAgent shortcut
-
-root_agent = ProcessLlmAgent(
-    name="Process_Architect_Orchestrator",
-    instruction_file="agent.txt",
-    before_model_callback=None,  # Disable before callback for root agent
-    after_model_callback=None,   # Disable after callback for root agent
-    sub_agents=[
-        full_design_pipeline,
-        consultant_agent,
-        scenario_tester_agent,
-        update_design_pipeline,
-        simulation_query_agent,
-        build_doc_creation_agent("Create_Doc_Agent"),
-        SubprocessDriverAgent(name="Subprocess_Driver_Agent_Main"),
-    ],
-)
+_root_agent = None
+
+
+_lazy_import_lock = threading.Lock()
+
+def _lazy_agent(module: str, attr: str, *args):
+    """
+    Returns a factory that imports .module and returns its attr (called with args,
+    if given). Used as a SubAgentLike callable so a branch module is only imported
+    when the orchestrator is actually built with that branch. Imports are serialised:
+    the factories may run on pool threads and several modules share dependencies.
+    """
+    def factory():
+        with _lazy_import_lock:
+            obj = getattr(importlib.import_module(f".{module}", __package__), attr)
+        return obj(*args) if args else obj
+    factory.__name__ = f"lazy_{attr}"
+    return factory
+
+
+def build_root_agent(include_doc: bool = True, include_subprocess: bool = True):
+    """
+    Validates the instruction files, then builds the orchestrator and its sub-agents.
+    The document creation and subprocess driver agents can be left out for variants
+    that do not need them.
+    """
+    logger.debug("Validating instruction files...")
+    if not validate_instruction_files():
+        logger.error("Instruction file validation failed. Aborting pipeline.")
+        sys.exit(1)
+
+    # Sub-agent modules load their instructions as they are imported; read them all ahead
+    prefetch_instructions()
+
+    from .agent_wrappers import ProcessLlmAgent  # DefaultLlmAgent shortcut
+
+    # Factories rather than imports: modules for branches left out of this variant
+    # (e.g. the document creation chain) are never imported
+    sub_agents = (
+        _lazy_agent("create_process_agent", "full_design_pipeline"),
+        _lazy_agent("consultant_agent", "consultant_agent"),
+        _lazy_agent("scenario_agent", "scenario_tester_agent"),
+        _lazy_agent("update_process_agent", "update_design_pipeline"),
+        _lazy_agent("simulation_agent", "simulation_query_agent"),
+    )
+    if include_doc:
+        sub_agents += (_lazy_agent("doc_creation_agent", "build_doc_creation_agent", "Create_Doc_Agent"),)
+    if include_subprocess:
+        sub_agents += (_lazy_agent("subprocess_driver_agent", "SubprocessDriverAgent", "Subprocess_Driver_Agent_Main"),)
+
+    # With compact history the orchestrator sees the rolling summary kept in session
+    # state instead of the full raw transcript of earlier turns
+    history_kwargs = {}
+    if COMPACT_HISTORY:
+        history_kwargs = {
+            "instruction": load_instruction("agent.txt") + HISTORY_INSTRUCTION,
+            "include_contents": "none",
+        }
+
+    agent = ProcessLlmAgent(
+        name="Process_Architect_Orchestrator",
+        instruction_file="agent.txt",
+        **history_kwargs,
+        before_model_callback=None,  # Disable before callback for root agent
+        after_model_callback=None,   # Disable after callback for root agent
+        sub_agents=sub_agents,
+    )
+    logger.debug("Pipeline initialised...")
+    return agent
+
+
+def get_root_agent():
+    """Returns the orchestrator, building the agent graph on first use."""
+    global _root_agent
+    if _root_agent is None:
+        _root_agent = build_root_agent()
+    return _root_agent
+
+
+def __getattr__(name: str):
+    # `root_agent` is built on first attribute access (PEP 562), so `--help` and the
+    # CLI helpers do not pay for importing and constructing the whole agent graph
+    if name == "root_agent":
+        return get_root_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ---------------------------------------------------------
 # LOCAL CHAT LOOP SUPPORT
 # ---------------------------------------------------------
-from google.adk.runners import Runner
-from google.adk.sessions.in_memory_session_service import InMemorySessionService
-from google.genai import types
+# Runner, session and genai types are imported inside the functions that use
+# them, so loading root_agent alone (e.g. `adk run`) skips them
 import asyncio
-import uuid
+import codecs
+import secrets
+import shlex
+import shutil
+from typing import List, Union
+
+
+# Response colours come from the properties file; resolve them and the prefixes built
+# from them once instead of on every displayed line
+INFO_COLOUR = getResponseColour("responseColourInfo") or ANSI_GREEN
+WARNING_COLOUR = getResponseColour("responseColourWarning") or ANSI_CYAN
+ERROR_COLOUR = getResponseColour("responseColourError") or ANSI_RED
+WARNING_PREFIX = f"{WARNING_COLOUR}[Warning]: "
+ERROR_PREFIX = f"{ERROR_COLOUR}[Error]: "
+BOT_PREFIX = f"{INFO_COLOUR}[ArchitectBot]: "
+BOT_EMPTY_LINE = f"{BOT_PREFIX}[No final response]{ANSI_RESET}"
 
 
 def display_text(text: str, type: str = "info"):
-    colour = getResponseColour("responseColourInfo")
-    warning = getResponseColour("responseColourWarning")
-    error = getResponseColour("responseColourError")    
-    if not colour:
-        colour = ANSI_GREEN
-    if not warning:
-        warning = ANSI_CYAN
-    if not error:
-        error = ANSI_RED
     if type == "info":
-        print(f"{colour}{text}{ANSI_RESET}")
+        print(INFO_COLOUR, text, ANSI_RESET, sep="")
     elif type == "warning":
-        print(f"{warning}[Warning]: {text}{ANSI_RESET}")
+        print(WARNING_PREFIX, text, ANSI_RESET, sep="")
     elif type == "error":
-        print(f"{error}[Error]: {text}{ANSI_RESET}")
+        print(ERROR_PREFIX, text, ANSI_RESET, sep="")
     sys.stdout.flush()
 
-def is_shell_command(text: str) -> bool:
-    if text is None:
-        return False
-    return text.strip().startswith("$")
+async def pace_after(started: float, interval: float):
+    """Sleeps only for the part of the pacing interval not already spent since `started`."""
+    remaining = interval - (time.monotonic() - started)
+    if remaining > 0:
+        await asyncio.sleep(remaining)
+
+# Directive keywords, looked up by the first token of an input line
+DIRECTIVES = {
+    "exit": "exit",
+    "quit": "exit",
+    "stop": "exit",
+    "clear": "clear",
+    "sleep": "sleep",
+    "wait": "sleep",
+}
+# These only count as directives when they are the whole line
+BARE_DIRECTIVES = frozenset({"exit", "clear"})
+
+
+def classify_directive(line: str):
+    """
+    Returns the directive kind of a stripped input line ("exit", "clear", "comment",
+    "sleep", "shell" or "agent"), or None if the line is an instruction for the orchestrator.
+    """
+    if not line:
+        return None
+    lead = line[0]
+    if lead == "#":
+        return "comment"
+    if lead == "$":
+        return "shell"
+    if lead == "@":
+        return "agent"
+    parts = line.split(None, 1)
+    kind = DIRECTIVES.get(parts[0].lower())
+    if kind in BARE_DIRECTIVES and len(parts) > 1:
+        return None
+    return kind
+
+
+async def _pump_stream(stream, write):
+    """
+    Copies a subprocess pipe to `write` a line at a time until EOF, so output appears
+    as each line completes and memory stays bounded by the stream limit. A line longer
+    than the limit is forwarded in pieces.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        try:
+            data = await stream.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            data = e.partial
+        except asyncio.LimitOverrunError as e:
+            data = await stream.read(e.consumed)
+        if not data:
+            break
+        write(decoder.decode(data))
+        sys.stdout.flush()
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        write(tail)
+        sys.stdout.flush()
+
+# Commands containing any of these need a real shell (pipes, redirects, globs, variables,
+# comments)
+SHELL_METACHARS = frozenset("|&;<>()$`*?[]{}~!#\n")
 
 
 async def run_shell_command(cmdline: str):
+    """
+    Runs a `$ command` line. Simple commands are executed directly without a shell;
+    commands using shell syntax, shell builtins or VAR=value prefixes (anything whose
+    first word is not an executable on PATH), lines prefixed with `$$`, and everything
+    on Windows (where most commands are cmd.exe builtins) go through the shell.
+    """
     import asyncio
     stripped = cmdline.strip()
-    command = stripped[1:].strip()
+    force_shell = stripped.startswith("$$")
+    command = stripped[2:].strip() if force_shell else stripped[1:].strip()
     display_text(f"[Shell]: {command}")
     try:
-        proc = await asyncio.create_subprocess_shell(
-            command,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+        use_shell = force_shell or os.name == "nt" or any(ch in SHELL_METACHARS for ch in command)
+        argv = None if use_shell else shlex.split(command)
+        if argv is not None:
+            if not argv:
+                return
+            # Builtins (cd, export, source, ...) and VAR=value prefixes only work in a shell
+            if "=" in argv[0] or shutil.which(argv[0]) is None:
+                argv = None
+        if argv is None:
+            proc = await asyncio.create_subprocess_shell(
+                command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        else:
+            proc = await asyncio.create_subprocess_exec(
+                *argv,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        # Forward output line by line as it arrives rather than buffering it until exit
+        await asyncio.gather(
+            _pump_stream(proc.stdout, lambda text: sys.stdout.write(text)),
+            _pump_stream(proc.stderr, lambda text: sys.stdout.write(f"{ERROR_COLOUR}{text}{ANSI_RESET}")),
         )
-        stdout, stderr = await proc.communicate()
-
-        if stdout:
-            display_text(stdout.decode("utf-8", errors="replace"), end="")
-
-        if stderr:
-            display_text(f"[Shell]: {stderr.decode('utf-8', errors='replace')}", type="error")
+        await proc.wait()
 
         if proc.returncode != 0:
             display_text(f"Shell command exited with code {proc.returncode}", type="error")
@@ -185,84 +395,403 @@ async def run_shell_command(cmdline: str):
     except Exception as e:
         display_text(f"[Shell]: Error executing command: {e}", type="error")
 
-async def init_session_and_runner(app_name: str = "ProcessArchitect"):
-    user_id = str(uuid.uuid4())
-    session_id = str(uuid.uuid4())
-    session_service = InMemorySessionService()
-    await session_service.create_session(
-        app_name=app_name,
+# ---------------------------------------------------------
+# PLAN CACHE
+# ---------------------------------------------------------
+# Remembers which sub-agent the orchestrator routed an instruction to, so a
+# repeated instruction can be sent straight to that sub-agent without paying
+# for another routing call on the orchestrator LLM. Off by default. Entries live
+# only for the chat session they were learnt in (never persisted), and short
+# lines ("yes", "continue", "update it") are never cached, since where those
+# belong depends on the conversation rather than on the text.
+ENABLE_PLAN_CACHE = getProperty("enablePlanCache", default=False)
+PLAN_CACHE_MIN_WORDS = getProperty("planCacheMinWords", default=4, cast=int)
+STREAM_RESPONSES = getProperty("streamResponses", default=True)
+
+
+class PlanCache:
+    def __init__(self):
+        self._entries = {}   # (session_id, normalised line) -> agent name
+
+    @staticmethod
+    def normalize(line: str) -> str:
+        return " ".join(line.lower().split())
+
+    @staticmethod
+    def cacheable(key: str) -> bool:
+        return len(key.split()) >= PLAN_CACHE_MIN_WORDS
+
+    def get(self, session_id: str, line: str):
+        key = self.normalize(line)
+        if not self.cacheable(key):
+            return None
+        return self._entries.get((session_id, key))
+
+    def put(self, session_id: str, line: str, agent_name: str):
+        key = self.normalize(line)
+        if self.cacheable(key):
+            self._entries[(session_id, key)] = agent_name
+
+
+plan_cache = PlanCache()
+_sub_agent_runners = {}
+
+
+def _sub_agent_runner(runner, agent_name: str):
+    """Returns a runner rooted at the named sub-agent, sharing the main session service."""
+    sub_agent = next((a for a in get_root_agent().sub_agents if a.name == agent_name), None)
+    if sub_agent is None:
+        return None
+    key = (id(runner.session_service), agent_name)
+    if key not in _sub_agent_runners:
+        from google.adk.runners import Runner
+        _sub_agent_runners[key] = Runner(
+            agent=sub_agent,
+            app_name=runner.app_name,
+            session_service=runner.session_service
+        )
+    return _sub_agent_runners[key]
+
+
+async def run_agent_turn(runner, user_id: str, session_id: str, text: Union[str, List[str]], use_plan_cache: bool = True):
+    """
+    Sends one instruction (or a batch of instructions, one part each) through the agent
+    graph, streams the reply to stdout as it arrives and returns the final response text.
+    With enablePlanCache, instructions seen before in this session are dispatched directly
+    to the sub-agent they were routed to.
+    """
+    from google.adk.agents.run_config import RunConfig, StreamingMode
+    from google.genai import types
+
+    texts = [text] if isinstance(text, str) else list(text)
+    text = "\n".join(texts)
+    cached_agent = plan_cache.get(session_id, text) if ENABLE_PLAN_CACHE and use_plan_cache else None
+    active_runner = _sub_agent_runner(runner, cached_agent) if cached_agent else None
+    if active_runner is None:
+        active_runner = runner
+        cached_agent = None
+    else:
+        logger.debug(f"Plan cache hit: dispatching directly to {cached_agent}")
+
+    run_config = RunConfig(
+        streaming_mode=StreamingMode.SSE if STREAM_RESPONSES else StreamingMode.NONE
+    )
+    content = types.Content(role="user", parts=[types.Part(text=t) for t in texts])
+    final_response = None
+    final_streamed = False
+    streaming_author = None
+    routed_to = None
+    # The run is drained to the end: a routed pipeline emits a final response per
+    # agent, so stopping at the first one would cancel the rest of the pipeline.
+    # Closing the generator explicitly releases it promptly if the turn fails.
+    events = active_runner.run_async(
         user_id=user_id,
         session_id=session_id,
-        state={}
+        new_message=content,
+        run_config=run_config
+    )
+    root_name = get_root_agent().name
+    try:
+        async for event in events:
+            author = event.author
+            if author == root_name:
+                actions = event.actions
+                if actions and actions.transfer_to_agent:
+                    routed_to = actions.transfer_to_agent
+
+            # Tool calls, state updates and transfers carry nothing to display
+            content = event.content
+            parts = content.parts if content else None
+            if not parts:
+                continue
+
+            # Partial events carry incremental text: write it out immediately
+            if event.partial:
+                chunk = "".join(p.text for p in parts if p.text)
+                if chunk:
+                    if streaming_author is None:
+                        # sys.stdout is looked up per write: Mute_Agent swaps it
+                        # for the log file partway through a pipeline turn
+                        sys.stdout.write(BOT_PREFIX)
+                        streaming_author = author
+                    sys.stdout.write(chunk)
+                    sys.stdout.flush()
+                continue
+
+            if event.is_final_response():
+                final_response = parts[0].text
+                final_streamed = streaming_author == author
+                if streaming_author is not None:
+                    sys.stdout.write(f"{ANSI_RESET}\n")
+                    sys.stdout.flush()
+                    streaming_author = None
+    finally:
+        await events.aclose()
+
+    if streaming_author is not None:
+        sys.stdout.write(f"{ANSI_RESET}\n")
+        sys.stdout.flush()
+
+    if ENABLE_PLAN_CACHE and routed_to and not cached_agent:
+        plan_cache.put(session_id, text, routed_to)
+
+    if not final_streamed:
+        if final_response:
+            print(BOT_PREFIX, final_response, ANSI_RESET, sep="")
+        else:
+            print(BOT_EMPTY_LINE)
+        sys.stdout.flush()
+
+    return final_response
+
+
+async def run_direct_agent_turn(runner, user_id: str, session_id: str, line: str):
+    """
+    Handles an `@Agent_Name payload` line by sending the payload straight to that
+    sub-agent of the orchestrator, skipping the routing call to the orchestrator model.
+    """
+    name, _, payload = line[1:].partition(" ")
+    payload = payload.strip()
+    direct_runner = _sub_agent_runner(runner, name)
+    if direct_runner is None:
+        names = ", ".join(a.name for a in get_root_agent().sub_agents)
+        display_text(f"Unknown agent '{name}'. Available agents: {names}", type="warning")
+        return None
+    if not payload:
+        display_text(f"No instruction given for agent '{name}'", type="warning")
+        return None
+    logger.debug(f"Direct dispatch to {name}")
+    return await run_agent_turn(direct_runner, user_id, session_id, payload, use_plan_cache=False)
+
+
+# ---------------------------------------------------------
+# SHORT-TERM HISTORY
+# ---------------------------------------------------------
+# The last few chat turns are kept verbatim in session state ("recent_turns") and
+# older ones are folded into a clipped one-line-per-turn "history_summary". With
+# compactHistory enabled the orchestrator reads these instead of the raw transcript,
+# which keeps its prompt small on long sessions.
+COMPACT_HISTORY = getProperty("compactHistory", default=False)
+RECENT_TURNS_LIMIT = 6
+SUMMARY_LINE_CHARS = 160
+SUMMARY_MAX_CHARS = 4000
+HISTORY_INSTRUCTION = """
+
+Conversation so far (older turns summarised, most recent turns verbatim):
+{history_summary?}
+{recent_turns?}
+"""
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+async def remember_turn(runner, user_id: str, session_id: str, user_text: str, reply: str):
+    """Records a completed chat turn in the session's short-term history state."""
+    from google.adk.events import Event, EventActions
+
+    session_service = runner.session_service
+    session = await session_service.get_session(
+        app_name=runner.app_name,
+        user_id=user_id,
+        session_id=session_id
     )
-    runner = Runner(
-        agent=root_agent,
-        app_name=app_name,
-        session_service=session_service
+    if session is None:
+        return
+
+    recent = list(session.state.get("recent_turns") or [])
+    recent.append({"user": _clip(user_text, 1000), "agent": _clip(reply, 1000)})
+    summary = session.state.get("history_summary") or ""
+    while len(recent) > RECENT_TURNS_LIMIT:
+        oldest = recent.pop(0)
+        line = _clip(f"- user: {oldest['user']} -> agent: {oldest['agent']}", SUMMARY_LINE_CHARS)
+        summary = f"{summary}\n{line}" if summary else line
+    if len(summary) > SUMMARY_MAX_CHARS:
+        summary = summary[-SUMMARY_MAX_CHARS:].split("\n", 1)[-1]
+
+    await session_service.append_event(
+        session,
+        Event(
+            author="user",
+            actions=EventActions(state_delta={"recent_turns": recent, "history_summary": summary}),
+        ),
     )
+
+
+SESSION_DB_FILE = os.path.join("output", "sessions.sqlite")
+SESSION_USER_ID = "local_user"
+# One runner per (app name, persistent) pair; new sessions are created on its service
+_RUNNER_CACHE = {}
+
+
+def _get_runner(app_name: str, persistent: bool):
+    """Returns the cached runner for the app, building it and its session service on first use."""
+    key = (app_name, persistent)
+    runner = _RUNNER_CACHE.get(key)
+    if runner is None:
+        from google.adk.runners import Runner
+
+        if persistent:
+            from google.adk.sessions import DatabaseSessionService
+
+            session_service = DatabaseSessionService(db_url=f"sqlite:///{SESSION_DB_FILE}")
+        else:
+            from google.adk.sessions.in_memory_session_service import InMemorySessionService
+
+            session_service = InMemorySessionService()
+        runner = Runner(
+            agent=get_root_agent(),
+            app_name=app_name,
+            session_service=session_service
+        )
+        _RUNNER_CACHE[key] = runner
+    return runner
+
+
+async def init_session_and_runner(app_name: str = "ProcessArchitect", session_name: str = None, reset: bool = False):
+    """
+    Returns the runner and a session for a chat or file run. Without a session name the
+    session lives in memory for this run only. With one, it is stored in
+    output/sessions.sqlite and resumed on later runs, so the model sees the same
+    conversation prefix again. `reset` discards a stored session first.
+    """
+    runner = _get_runner(app_name, persistent=bool(session_name))
+    session_service = runner.session_service
+
+    if session_name:
+        user_id = SESSION_USER_ID
+        session_id = session_name
+        session = await session_service.get_session(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id
+        )
+        if session is not None and reset:
+            await session_service.delete_session(
+                app_name=app_name,
+                user_id=user_id,
+                session_id=session_id
+            )
+            session = None
+        if session is None:
+            await session_service.create_session(
+                app_name=app_name,
+                user_id=user_id,
+                session_id=session_id,
+                state={"history_summary": "", "recent_turns": []}
+            )
+        else:
+            logger.debug(f"Resuming session '{session_id}' with {len(session.events)} events")
+    else:
+        user_id = secrets.token_hex(16)
+        session_id = secrets.token_hex(16)
+        await session_service.create_session(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            state={"history_summary": "", "recent_turns": []}
+        )
     return runner, user_id, session_id
 
 
+async def discard_session(runner, user_id: str, session_id: str):
+    """Deletes a replaced in-memory session so the shared session service does not keep growing."""
+    await runner.session_service.delete_session(
+        app_name=runner.app_name,
+        user_id=user_id,
+        session_id=session_id
+    )
+
+
 # ---------------------------------------------------------
 # FILE MODE
 # ---------------------------------------------------------
-async def process_file(file_path: str):
+def _read_instruction_lines(file_path: str) -> List[str]:
+    with open(file_path, "r", encoding="utf-8-sig") as f:
+        return f.read().splitlines()
+
+
+async def process_file(file_path: str, batch_size: int = 1, session_name: str = None):
+    # Read the whole file in one block on a worker thread, then iterate in memory
     try:
-        with open(file_path, "r", encoding="utf-8-sig"):
-            pass
-    except Exception as e:
+        lines = await asyncio.to_thread(_read_instruction_lines, file_path)
+    except (OSError, UnicodeDecodeError) as e:
         display_text(f"- Error opening file '{file_path}': {e}", type="error")
         sys.exit(1)
 
-    runner, user_id, session_id = await init_session_and_runner()
+    runner, user_id, session_id = await init_session_and_runner(session_name=session_name)
 
-    try:
-        with open(file_path, "r", encoding="utf-8-sig") as f:
-            for raw_line in f:
-                line = raw_line.strip()
-                if not line:
-                    continue
-
-                if line.lower() in ["exit", "quit", "stop"]:
-                    display_text("Exiting Process Architect Orchestrator.")
-                    break
-                elif line.lower() == "clear":
-                    display_text("[Action]: Clearing all histories and resetting session...")
-                    runner, user_id, session_id = await init_session_and_runner()
-                    continue
-                elif line.startswith("#"):
-                    display_text(f"[Comment]: {line}")
-                    continue
-                elif line.lower().startswith("sleep") or line.lower().startswith("wait"):
-                    parts = line.split()
-                    secs = parts[1] if len(parts) > 1 else getProperty("modelSleep", default=0.5)
-                    display_text(f"[Action]: Sleeping for {secs} seconds...")
-                    await asyncio.sleep(float(secs))
-                    continue
-                elif is_shell_command(line):
-                    await run_shell_command(line)
-                    await asyncio.sleep(float(getProperty("modelSleep", default=0.25)))
-                    continue
+    # Consecutive instructions are sent to the orchestrator together, up to batch_size
+    # per call. Any directive (exit, clear, comment, sleep, shell, @agent) closes the current batch.
+    batch = []
 
+    # Pacing is applied before a model call rather than after every instruction, so
+    # local directives (comments, shell, sleep) and the end of the file never wait on it,
+    # and time they take counts towards the interval.
+    last_model_call = None
 
-                display_text(f"[user-file]: {line}")
+    async def pace_model_call():
+        nonlocal last_model_call
+        if last_model_call is not None:
+            await pace_after(last_model_call, MODEL_SLEEP)
+        last_model_call = time.monotonic()
 
-                content = types.Content(role="user", parts=[types.Part(text=line)])
-                final_response = None
-                async for event in runner.run_async(
-                    user_id=user_id,
-                    session_id=session_id,
-                    new_message=content
-                ):
-                    if event.is_final_response() and event.content and event.content.parts:
-                        final_response = event.content.parts[0].text
+    async def flush_batch():
+        if not batch:
+            return
+        for text in batch:
+            display_text(f"[user-file]: {text}")
+        await pace_model_call()
+        await run_agent_turn(runner, user_id, session_id, batch)
+        batch.clear()
 
-                if final_response:
-                    display_text(f"[ArchitectBot]: {final_response}")
-                else:
-                    display_text(f"[ArchitectBot]: [No final response]")
+    try:
+        for raw_line in lines:
+            line = raw_line.strip()
+            if not line:
+                continue
+
+            kind = classify_directive(line)
+            if kind is not None:
+                await flush_batch()
+
+            if kind == "exit":
+                display_text("Exiting Process Architect Orchestrator.")
+                flush_logs()
+                break
+            elif kind == "clear":
+                display_text("[Action]: Clearing all histories and resetting session...")
+                if not session_name:
+                    await discard_session(runner, user_id, session_id)
+                runner, user_id, session_id = await init_session_and_runner(session_name=session_name, reset=True)
+                continue
+            elif kind == "comment":
+                display_text(f"[Comment]: {line}")
+                continue
+            elif kind == "sleep":
+                parts = line.split()
+                secs = parts[1] if len(parts) > 1 else MODEL_SLEEP
+                display_text(f"[Action]: Sleeping for {secs} seconds...")
+                await asyncio.sleep(float(secs))
+                continue
+            elif kind == "shell":
+                started = time.monotonic()
+                await run_shell_command(line)
+                await pace_after(started, SHELL_SLEEP)
+                continue
+            elif kind == "agent":
+                display_text(f"[user-file]: {line}")
+                await pace_model_call()
+                await run_direct_agent_turn(runner, user_id, session_id, line)
+                continue
 
-                await asyncio.sleep(float(getProperty("modelSleep", default=0.5)))
+            batch.append(line)
+            if len(batch) >= batch_size:
+                await flush_batch()
+        else:
+            await flush_batch()
 
     except Exception as e:
         sys.stdout = sys.__stdout__
@@ -274,53 +803,64 @@ async def process_file(file_path: str):
 # ---------------------------------------------------------
 # INTERACTIVE MODE
 # ---------------------------------------------------------
-async def start_local_chat():
+async def _ainput(prompt: str) -> str:
+    """
+    Reads a stripped line from stdin on the default executor so the event loop (log
+    flushing, subprocess pipes) keeps running while the user types. End of input
+    (Ctrl-D or a closed pipe) is returned as "exit".
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        line = await loop.run_in_executor(None, input, prompt)
+    except EOFError:
+        print()
+        return "exit"
+    return line.strip()
+
+
+async def start_local_chat(session_name: str = None):
     display_text("Process Architect Orchestrator (local mode)")
     display_text("Type 'exit' to quit.")
 
-    runner, user_id, session_id = await init_session_and_runner()
+    runner, user_id, session_id = await init_session_and_runner(session_name=session_name)
 
     while True:
-        user_input = input("[user]: ").strip()
+        user_input = await _ainput("[user]: ")
 
-        if user_input.lower() in ["exit", "quit", "stop"]:
+        kind = classify_directive(user_input)
+        if kind == "exit":
             display_text("Exiting Process Architect Orchestrator.")
+            flush_logs()
             break
-        elif user_input.lower() == "clear":
+        elif kind == "clear":
             display_text("[Action]: Clearing all histories and resetting session...")
-            runner, user_id, session_id = await init_session_and_runner()
+            if not session_name:
+                await discard_session(runner, user_id, session_id)
+            runner, user_id, session_id = await init_session_and_runner(session_name=session_name, reset=True)
             continue
-        elif user_input.startswith("#"):
+        elif kind == "comment":
             display_text(f"[Comment]: {user_input}")
             continue
-        elif user_input.lower().startswith("sleep") or user_input.lower().startswith("wait"):
+        elif kind == "sleep":
             parts = user_input.split()
-            secs = parts[1] if len(parts) > 1 else getProperty("modelSleep", default=0.5)
+            secs = parts[1] if len(parts) > 1 else MODEL_SLEEP
             display_text(f"[Action]: Sleeping for {secs} seconds...")
             await asyncio.sleep(float(secs))
             continue
-        elif is_shell_command(user_input):
+        elif kind == "shell":
+            started = time.monotonic()
             await run_shell_command(user_input)
-            await asyncio.sleep(float(getProperty("modelSleep", default=0.25)))
+            await pace_after(started, SHELL_SLEEP)
             continue
 
         try:
-            content = types.Content(role="user", parts=[types.Part(text=user_input)])
-            events = runner.run_async(
-                user_id=user_id,
-                session_id=session_id,
-                new_message=content
-            )
-
-            final_response = None
-            async for event in events:
-                if event.is_final_response() and event.content and event.content.parts:
-                    final_response = event.content.parts[0].text
-
-            if final_response:
-                display_text(f"[ArchitectBot]: {final_response}")
+            if kind == "agent":
+                reply = await run_direct_agent_turn(runner, user_id, session_id, user_input)
             else:
-                display_text(f"[ArchitectBot]: [No final response]")
+                reply = await run_agent_turn(runner, user_id, session_id, user_input)
+            # The history state is only read by the compact-history instruction
+            if COMPACT_HISTORY:
+                await remember_turn(runner, user_id, session_id, user_input, reply)
 
         except Exception as e:
             sys.stdout = sys.__stdout__
@@ -340,18 +880,51 @@ async def run_cli():
         required=False,
         help="Process file instructions from a text file (one instruction per line). If not provided, starts in interactive chat mode."
     )
+    parser.add_argument(
+        "-b", "--batch",
+        dest="batch",
+        type=int,
+        default=1,
+        help="With --file, send up to N consecutive instructions to the orchestrator in a single call (default 1)."
+    )
+    parser.add_argument(
+        "-s", "--session", "--resume",
+        dest="session",
+        metavar="NAME",
+        type=str,
+        default=None,
+        help="Store the conversation under NAME in output/sessions.sqlite and resume it on later runs. If not provided, the session is discarded on exit."
+    )
     args = parser.parse_args()
 
-    if args.file:
-        await process_file(args.file)
-        return
+    try:
+        if args.file:
+            await process_file(args.file, batch_size=max(1, args.batch), session_name=args.session)
+            return
 
-    display_text("- Starting Process Architect Orchestrator in local chat mode...")
-    await start_local_chat()
+        display_text("- Starting Process Architect Orchestrator in local chat mode...")
+        await start_local_chat(session_name=args.session)
+    finally:
+        flush_logs()
 
 # ---------------------------------------------------------
 # MAIN EXECUTION BLOCK
 # ---------------------------------------------------------
+def install_event_loop_policy():
+    """Switches asyncio to uvloop (winloop on Windows) when available; the default loop is used otherwise."""
+    try:
+        if os.name == "nt":
+            import winloop as fast_loop
+        else:
+            import uvloop as fast_loop
+    except ImportError:
+        logger.debug("uvloop/winloop not installed, using the default asyncio event loop")
+        return
+    fast_loop.install()
+    logger.debug(f"Using {fast_loop.__name__} event loop")
+
+
 if __name__ == "__main__":
     logger.debug("Pipeline initialized and ready for execution.")
+    install_event_loop_policy()
     asyncio.run(run_cli())
\ No newline at end of file
@@ -1,7 +1,6 @@
 # Import base/shared agents referenced in pipelines
 from .analysis_agent import analysis_agent
 from .compliance_agent import compliance_agent
-from .consultant_agent import consultant_agent
 from .create_process_agent import full_design_pipeline
 from .doc_creation_agent import build_doc_creation_agent
 from .grounding_agent import grounding_agent
@@ -26,6 +25,7 @@ from .create_process_agent import (
     design_compliance_instance,
     design_simulation_instance,
     design_grounding_instance,
+    design_revision_instance,
     json_stop_agent,
     full_design_pipeline
 )
@@ -41,6 +41,7 @@ from .update_process_agent import (
     design_grounding_inst,
     grounding_inst,
     design_compliance_inst,
+    design_revision_inst,
     json_stop_agent_instance,
     writer_inst,
     mute_agent_instance,
@@ -49,7 +50,9 @@ from .update_process_agent import (
     update_design_pipeline
 )
 
-CREATE_PIPELINE_AGENTS = [
+# The per-auditor and revision design passes only exist for the loop layout in use
+# (enableParallelAudits), so the roles that were not built (None) are left out
+CREATE_PIPELINE_AGENTS = [agent for agent in [
     # Stage 1: Analysis
     analysis_agent,
     
@@ -61,6 +64,7 @@ CREATE_PIPELINE_AGENTS = [
     design_simulation_instance,
     grounding_agent,
     design_grounding_instance,
+    design_revision_instance,
     stop_controller_agent,
     
     # Stage 3: Normalization Loop
@@ -72,9 +76,9 @@ CREATE_PIPELINE_AGENTS = [
     # Utility Agents
     mute_agent,
     unmute_agent
-]
+] if agent is not None]
 
-UPDATE_PIPELINE_AGENTS = [
+UPDATE_PIPELINE_AGENTS = [agent for agent in [
         # Stage 1: Context-Aware Analysis
     update_analysis_agent,
     
@@ -86,6 +90,7 @@ UPDATE_PIPELINE_AGENTS = [
     design_simulation_inst,
     grounding_inst,
     design_grounding_inst,
+    design_revision_inst,
     
     # Stage 3: Stabilization Loop
     normalizer_inst,
@@ -97,4 +102,4 @@ UPDATE_PIPELINE_AGENTS = [
     mute_agent_instance,
     unmute_agent_instance,
     stop_controller_agent_instance
-]
\ No newline at end of file
+] if agent is not None]
\ No newline at end of file
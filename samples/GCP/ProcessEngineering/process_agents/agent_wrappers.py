@@ -2,31 +2,89 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, Optional, Sequence, Callable, List, Union
-
-from google.adk.agents import LlmAgent, Agent
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
+import os
+from typing import Any, AsyncGenerator, Dict, Optional, Sequence, Callable, List, Union
+
+from google.adk.agents import BaseAgent, LlmAgent, Agent, LoopAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.tools.tool_context import ToolContext
 from google.genai import types
+from typing_extensions import override
 
 from .utils import (
+    PROJECT_ROOT,
+    canonical_json,
     getProperty,
+    json_loads,
     load_instruction,
     review_messages,
     review_outputs,
 )
 
+logger = logging.getLogger("ProcessArchitect.AgentWrappers")
+
 # --- NEW: sentinel so callers can distinguish "use default" vs "None (disable)" ---
 _DEFAULT = object()   # private unique marker
 
+# Default model for every wrapped agent, read from the properties once
+DEFAULT_MODEL = getProperty("MODEL")
+
 
 # (unchanged) helper(s) ...
+@functools.lru_cache(maxsize=64)
+def _build_gcc(
+    temperature: Optional[float],
+    top_p: Optional[float],
+    top_k: Optional[int],
+    response_mime_type: Optional[str],
+) -> types.GenerateContentConfig:
+    # Agents with the same knobs share one config object; ADK copies the agent's
+    # config into each request before touching it, so sharing is safe
+    return types.GenerateContentConfig(
+        temperature=temperature, top_p=top_p, top_k=top_k, response_mime_type=response_mime_type
+    )
+
+
 def _maybe_build_generate_config(
     temperature: Optional[float] = None,
     top_p: Optional[float] = None,
     top_k: Optional[int] = None,
+    response_mime_type: Optional[str] = None,
 ) -> Optional[types.GenerateContentConfig]:
-    if temperature is None and top_p is None and top_k is None:
+    # Response schemas are not set here: ADK rejects generate_content_config.response_schema
+    # and requires LlmAgent.output_schema (a pydantic model) instead
+    if all(v is None for v in (temperature, top_p, top_k, response_mime_type)):
         return None
-    return types.GenerateContentConfig(temperature=temperature, top_p=top_p, top_k=top_k)
+    return _build_gcc(temperature, top_p, top_k, response_mime_type)
+
+
+# Kill switch for the per-agent `parallel_tools` option below
+PARALLEL_TOOLS = getProperty("parallelTools", default=True)
+
+
+def _threaded_tool(func: Any) -> Any:
+    """
+    Wraps a synchronous tool function in an async one that runs it on a worker thread.
+    ADK awaits async tools concurrently when the model issues several calls in one turn,
+    but calls synchronous ones inline on the event loop, one after another. functools.wraps
+    keeps the name, docstring and signature ADK builds the tool declaration from.
+    Agents running in a ParallelAgent share one event loop, so without this a blocking
+    tool in one branch also stalls the others.
+    """
+    if not inspect.isfunction(func) or inspect.iscoroutinefunction(func):
+        return func
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    return wrapper
 
 
 SubAgentLike = Union[Any, Callable[[], Any]]
@@ -34,6 +92,11 @@ SubAgentLike = Union[Any, Callable[[], Any]]
 def _resolve_sub_agents(sub_agents: Optional[Sequence[SubAgentLike]]) -> Optional[List[Any]]:
     if sub_agents is None:
         return None
+    sub_agents = list(sub_agents)
+    # Common case: a plain list of already-built agents needs no walk at all
+    if not any(sa is None or callable(sa) or isinstance(sa, (list, tuple)) for sa in sub_agents):
+        return sub_agents
+
     resolved: List[Any] = []
     for sa in sub_agents:
         obj = sa() if callable(sa) else sa
@@ -67,18 +130,25 @@ class DefaultLlmAgent(LlmAgent):
         temperature: Optional[float] = None,
         top_p: Optional[float] = None,
         top_k: Optional[int] = None,
+        response_mime_type: Optional[str] = None,
+        # run synchronous tools on worker threads so multiple calls overlap; needed by
+        # agents inside a ParallelAgent (the audit stages), whose blocking tools would
+        # otherwise stall their siblings on the shared event loop
+        parallel_tools: bool = False,
         # --- CHANGED: use sentinel defaults so you can pass None to disable ---
         before_model_callback: Any = _DEFAULT,
         after_model_callback: Any = _DEFAULT,
         **kwargs: Any,
     ) -> None:
 
-        resolved_model = model or getProperty("MODEL")
+        resolved_model = model or DEFAULT_MODEL
 
         if instruction is None and instruction_file:
             instruction = load_instruction(instruction_file)
 
         tools = list(tools) if tools is not None else []
+        if parallel_tools and PARALLEL_TOOLS:
+            tools = [_threaded_tool(t) for t in tools]
 
         init_kwargs: Dict[str, Any] = {
             "name": name,
@@ -100,8 +170,11 @@ class DefaultLlmAgent(LlmAgent):
             init_kwargs["include_contents"] = include_contents
 
         resolved_gcc = generate_content_config or _maybe_build_generate_config(
-            temperature=temperature, top_p=top_p, top_k=top_k
+            temperature=temperature, top_p=top_p, top_k=top_k,
+            response_mime_type=response_mime_type,
         )
+        if generate_content_config is not None and response_mime_type is not None:
+            resolved_gcc = generate_content_config.model_copy(update={"response_mime_type": response_mime_type})
         if resolved_gcc is not None:
             init_kwargs["generate_content_config"] = resolved_gcc
 
@@ -145,6 +218,13 @@ class DefaultLlmAgent(LlmAgent):
         new_agent.tools = list(self.tools) if self.tools else []
         return new_agent
 
+    # --- shallow_clone() method ---
+    # Cheaper alternative to clone() when only the name differs: a pydantic model_copy that
+    # skips the constructor and field validation. Instruction, tools and config are shared
+    # by reference with the original, so treat them as read-only on both agents.
+    def shallow_clone(self, name: str):
+        return self.model_copy(update={"name": name, "parent_agent": None, "sub_agents": []})
+
 class DefaultAgent(Agent):
     def __init__(
         self,
@@ -159,18 +239,22 @@ class DefaultAgent(Agent):
         output_key: Optional[str] = None,
         include_contents: Optional[Sequence[Any]] = None,
         generate_content_config: Optional[types.GenerateContentConfig] = None,
+        # run synchronous tools on worker threads so multiple calls overlap
+        parallel_tools: bool = False,
         # --- CHANGED: sentinel defaults here too ---
         before_model_callback: Any = _DEFAULT,
         after_model_callback: Any = _DEFAULT,
         **kwargs: Any,
     ) -> None:
 
-        resolved_model = model or getProperty("MODEL")
+        resolved_model = model or DEFAULT_MODEL
 
         if instruction is None and instruction_file:
             instruction = load_instruction(instruction_file)
 
         tools = list(tools) if tools is not None else []
+        if parallel_tools and PARALLEL_TOOLS:
+            tools = [_threaded_tool(t) for t in tools]
 
         init_kwargs: Dict[str, Any] = {
             "name": name,
@@ -232,9 +316,278 @@ class DefaultAgent(Agent):
         new_agent.tools = list(self.tools) if self.tools else []
         return new_agent
 
+    # --- shallow_clone() method ---
+    # Cheaper alternative to clone() when only the name differs: a pydantic model_copy that
+    # skips the constructor and field validation. Instruction, tools and config are shared
+    # by reference with the original, so treat them as read-only on both agents.
+    def shallow_clone(self, name: str):
+        return self.model_copy(update={"name": name, "parent_agent": None, "sub_agents": []})
+
 # Convenience factories
 def ProcessLlmAgent(name: str, **overrides: Any) -> DefaultLlmAgent:
     return DefaultLlmAgent(name=name, **overrides)
 
 def ProcessAgent(name: str, **overrides: Any) -> DefaultAgent:
     return DefaultAgent(name=name, **overrides)
+
+
+# ---------------------------------------------------------------------
+# ZERO-LLM AGENTS
+# ---------------------------------------------------------------------
+class FunctionAgent(BaseAgent):
+    """
+    Agent that calls one local Python function directly instead of prompting a model to
+    call it as a tool. For deterministic steps (stop controller, console mute/unmute)
+    this saves a model round-trip per run. A function taking `tool_context` receives a
+    ToolContext, so escalation and state changes it makes are carried on the emitted
+    event just as they would be from a tool call. With `silent`, nothing is emitted
+    unless the function escalates or changes state.
+    """
+    fn: Callable[..., Any]
+    silent: bool = False
+
+    def shallow_clone(self, name: str):
+        return self.model_copy(update={"name": name, "parent_agent": None, "sub_agents": []})
+
+    @override
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        kwargs = {}
+        actions = EventActions()
+        if "tool_context" in inspect.signature(self.fn).parameters:
+            tool_context = ToolContext(ctx, event_actions=actions)
+            kwargs["tool_context"] = tool_context
+
+        if inspect.iscoroutinefunction(self.fn):
+            result = await self.fn(**kwargs)
+        else:
+            result = await asyncio.to_thread(self.fn, **kwargs)
+        logger.debug("%s: %s returned %.200s", self.name, self.fn.__name__, result)
+
+        if self.silent and not actions.escalate and not actions.state_delta:
+            return
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=None if self.silent else types.Content(
+                role="model",
+                parts=[types.Part(text=str(result))]
+            ),
+            actions=actions,
+        )
+
+
+# ---------------------------------------------------------------------
+# CONVERGENCE-AWARE LOOPS
+# ---------------------------------------------------------------------
+DESIGN_FILE = os.path.join(PROJECT_ROOT, "output", "process_data.json")
+EMBEDDING_MODEL = getProperty("embeddingModel", default="text-embedding-004")
+# Embedding inputs are clipped; the head of the design JSON carries its structure
+EMBEDDING_MAX_CHARS = 8000
+
+_embedding_client = None
+_embedding_cache: Dict[str, Any] = {}   # sha256(text) -> L2-normalised vector
+
+
+def _embed_text(text: str):
+    """Returns the L2-normalised embedding of `text`, reusing earlier results for identical text."""
+    global _embedding_client
+    import numpy as np
+
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    cached = _embedding_cache.get(digest)
+    if cached is not None:
+        return cached
+
+    if _embedding_client is None:
+        from google import genai
+
+        _embedding_client = genai.Client()
+    response = _embedding_client.models.embed_content(
+        model=EMBEDDING_MODEL,
+        contents=text[:EMBEDDING_MAX_CHARS],
+    )
+    vector = np.asarray(response.embeddings[0].values, dtype=float)
+    norm = np.linalg.norm(vector)
+    if norm:
+        vector = vector / norm
+    _embedding_cache[digest] = vector
+    return vector
+
+
+# Seconds between checks of `ready_file` when watchfiles is not installed
+READY_POLL_INTERVAL = getProperty("approvalPollInterval", default=1.0, cast=float)
+
+
+async def _watch_until_ready(path: str, ready_check: Callable[[], bool], ready: asyncio.Event) -> None:
+    """
+    Sets `ready` once `ready_check()` passes after a change to `path`. Uses filesystem
+    notifications (watchfiles: inotify/FSEvents/ReadDirectoryChangesW) when available,
+    otherwise polls every READY_POLL_INTERVAL seconds. The directory is watched, since
+    the file itself may not exist yet, but only its top level and only events for the
+    file itself, so writes elsewhere in output/ do not wake the watcher.
+    """
+    try:
+        from watchfiles import awatch
+    except ImportError:
+        awatch = None
+
+    if awatch is None:
+        while not ready.is_set():
+            await asyncio.sleep(READY_POLL_INTERVAL)
+            if await asyncio.to_thread(ready_check):
+                ready.set()
+        return
+
+    directory, name = os.path.split(path)
+    os.makedirs(directory, exist_ok=True)
+    async for _ in awatch(
+        directory,
+        watch_filter=lambda _change, changed: os.path.basename(changed) == name,
+        recursive=False,
+        stop_event=ready,
+    ):
+        if await asyncio.to_thread(ready_check):
+            ready.set()
+
+
+class ConvergenceLoop(LoopAgent):
+    """
+    LoopAgent that also stops once the file its iterations rewrite has converged. After
+    every iteration a snapshot of `watch_file` is taken and compared with the previous
+    iteration's; `patience` consecutive stable comparisons end the loop. max_iterations
+    remains the hard cap, and an escalation from a sub-agent (the stop controller) still
+    ends the loop immediately. A missing or unreadable snapshot resets the count, so the
+    loop then behaves like a plain LoopAgent. Subclasses override the snapshot and the
+    stability test; by default (and always, without either) a byte-identical file counts
+    as stable. patience=0 turns convergence tracking off.
+
+    With `ready_check` and `ready_file`, the loop also watches that file while it runs;
+    once a change makes `ready_check()` true, the remaining sub-agents of the iteration
+    are skipped and control goes straight to the last one (the stop controller), which
+    then ends the loop through its normal path. This works with or without convergence
+    tracking.
+    """
+    watch_file: str = DESIGN_FILE
+    patience: int = 1
+    ready_check: Optional[Callable[[], bool]] = None
+    ready_file: Optional[str] = None
+
+    def _read_watch_file(self) -> Optional[str]:
+        try:
+            with open(self.watch_file, "r", encoding="utf-8") as f:
+                text = f.read()
+        except OSError:
+            return None
+        return text if text.strip() else None
+
+    def _snapshot(self, text: str) -> Any:
+        # Default: the text itself, so a plain ConvergenceLoop stops on byte-identical output
+        return text
+
+    def _is_stable(self, previous: Any, current: Any) -> bool:
+        return previous == current
+
+    @override
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        ready = asyncio.Event()
+        watcher = None
+        if self.ready_check is not None and self.ready_file:
+            watcher = asyncio.create_task(_watch_until_ready(self.ready_file, self.ready_check, ready))
+        try:
+            async for event in self._run_iterations(ctx, ready):
+                yield event
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+    async def _run_iterations(self, ctx: InvocationContext, ready: asyncio.Event) -> AsyncGenerator[Event, None]:
+        previous = None
+        previous_digest = None
+        stable_rounds = 0
+        iteration = 0
+        last_agent = self.sub_agents[-1] if self.sub_agents else None
+        # `patience` stable comparisons need patience + 1 snapshots, and a stop after the
+        # final iteration saves nothing: with max_iterations <= patience + 1 the loop can
+        # never end early, so no snapshots (or embedding calls) are taken at all
+        track = self.patience > 0 and (not self.max_iterations or self.max_iterations > self.patience + 1)
+        if self.patience > 0 and not track:
+            logger.debug(f"{self.name}: max_iterations {self.max_iterations} leaves no room for "
+                         f"patience {self.patience}, convergence tracking disabled")
+        while not self.max_iterations or iteration < self.max_iterations:
+            for sub_agent in self.sub_agents:
+                if ready.is_set() and sub_agent is not last_agent:
+                    logger.debug(f"{self.name}: approvals ready, skipping {sub_agent.name}")
+                    continue
+                should_exit = False
+                async for event in sub_agent.run_async(ctx):
+                    yield event
+                    if event.actions and event.actions.escalate:
+                        should_exit = True
+                if should_exit:
+                    return
+            iteration += 1
+            if not track or iteration == self.max_iterations:
+                continue
+
+            text = await asyncio.to_thread(self._read_watch_file)
+            digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest() if text else None
+            # Byte-identical output is a fixpoint: count it as stable without building
+            # a snapshot (no canonical JSON, no embedding lookup)
+            if digest is not None and digest == previous_digest and previous is not None:
+                stable_rounds += 1
+                logger.debug(f"{self.name}: iteration {iteration} unchanged ({stable_rounds}/{self.patience} stable)")
+                if stable_rounds >= self.patience:
+                    logger.info(f"{self.name}: output converged after {iteration} iterations, stopping loop.")
+                    return
+                continue
+            previous_digest = digest
+
+            current = await asyncio.to_thread(self._snapshot, text) if text is not None else None
+            if current is None:
+                previous = None
+                stable_rounds = 0
+                continue
+            if previous is not None:
+                stable_rounds = stable_rounds + 1 if self._is_stable(previous, current) else 0
+                logger.debug(f"{self.name}: iteration {iteration} ({stable_rounds}/{self.patience} stable)")
+                if stable_rounds >= self.patience:
+                    logger.info(f"{self.name}: output converged after {iteration} iterations, stopping loop.")
+                    return
+            previous = current
+
+
+class SemanticStoppingLoop(ConvergenceLoop):
+    """
+    ConvergenceLoop for the design loops: iterations are stable when the embeddings of
+    consecutive designs have cosine similarity of at least `similarity_threshold`.
+    If the design cannot be embedded the loop runs on as a plain LoopAgent.
+    """
+    similarity_threshold: float = 0.98
+
+    def _snapshot(self, text: str) -> Any:
+        try:
+            return _embed_text(text)
+        except Exception as e:
+            logger.warning(f"{self.name}: design embedding failed, convergence check skipped: {e}")
+            return None
+
+    def _is_stable(self, previous: Any, current: Any) -> bool:
+        similarity = float(previous @ current)
+        logger.debug(f"{self.name}: design similarity {similarity:.4f}")
+        return similarity >= self.similarity_threshold
+
+
+class StallAwareLoop(ConvergenceLoop):
+    """
+    ConvergenceLoop for the JSON normalization loops: iterations are stable when the
+    normalized JSON is unchanged, compared in canonical form (canonical_json: sorted
+    keys) so formatting and key order do not count as changes. No extra model calls
+    are made.
+    """
+
+    def _snapshot(self, text: str) -> Any:
+        try:
+            return canonical_json(json_loads(text))
+        except ValueError:
+            return None
@@ -1,45 +1,46 @@
 # process_agents/analysis_agent.py
 
+import asyncio
 import os
-import time
 import logging
-import random
 import json
 from typing import Any
 
 from .utils import (
+    PROJECT_ROOT,
     save_iteration_feedback,
-    getProperty,
 )
 
 logger = logging.getLogger("ProcessArchitect.Analysis")
 
 def _remove_previous_approval_logs():
-    # Silently remove output/approval.json, ignore exceptions
-    approvalLog = "output/approval.json"
-    counterLog = "output/stop_counter.json"
-    try:
-        if os.path.exists(approvalLog):
-            os.remove(approvalLog)
-        if os.path.exists(counterLog):
-            os.remove(counterLog)
-    except Exception:
-        pass
+    # Silently remove the previous run's approval, loop counter and pending feedback
+    # (parallel audits merge into unconsumed feedback), ignore exceptions
+    output_dir = os.path.join(PROJECT_ROOT, "output")
+    approvalLog = os.path.join(output_dir, "approval.json")
+    counterLog = os.path.join(output_dir, "stop_counter.json")
+    feedbackLog = os.path.join(output_dir, "iteration_feedback.json")
+    for path in (approvalLog, counterLog, feedbackLog):
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # FileNotFoundError is the usual case on a fresh run
     return "Previous approval logs cleared."
 
-def log_analysis_metadata(sector: str, goal_count: int):
+async def log_analysis_metadata(sector: str, goal_count: int):
     """Internal tool to track extraction progress and CLEAN environment."""
-    time.sleep(float(getProperty("modelSleep")) + random.random() * 0.75)
-    _remove_previous_approval_logs()
-    logger.debug(f"Analysis Metadata - Sector: {sector}, Goals Identified: {goal_count}.")
+    await asyncio.to_thread(_remove_previous_approval_logs)
+    logger.debug("Analysis Metadata - Sector: %s, Goals Identified: %s.", sector, goal_count)
     return f"Analysis started for {sector} with {goal_count} identified objectives."
 
-def record_analysis_request(request: str):
-    """Internal tool to log the original user request for traceability."""
-    time.sleep(float(getProperty("modelSleep")) + random.random() * 0.75)
-    logger.debug(f"Original Analysis Request: {request}")
-    _remove_previous_approval_logs()
-    return "User request logged."
+async def begin_analysis(sector: str, goal_count: int, request: str):
+    """Internal tool called once at the start of analysis: logs the original user request
+    for traceability, logs sector and goal metadata, and CLEANS the environment."""
+    # File removal goes to a worker thread so a slow filesystem never stalls the event loop
+    await asyncio.to_thread(_remove_previous_approval_logs)
+    logger.debug("Original Analysis Request: %s", request)
+    logger.debug("Analysis Metadata - Sector: %s, Goals Identified: %s.", sector, goal_count)
+    return f"User request logged. Analysis started for {sector} with {goal_count} identified objectives."
 
 # -----------------------------
 # ANALYSIS AGENT
@@ -51,8 +52,8 @@ analysis_agent = ProcessLlmAgent(
     description="Performs deep analysis of process descriptions.",
     instruction_file="analysis_agent.txt",   # auto-loads via load_instruction(...)
     tools=[
-        log_analysis_metadata,
-        record_analysis_request,
+        begin_analysis,
         save_iteration_feedback,
     ],
+    parallel_tools=True,
 )
\ No newline at end of file
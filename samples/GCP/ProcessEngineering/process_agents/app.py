@@ -6,13 +6,24 @@ Flask application for serving process engineering models and APIs.
 This app loads process context data, exposes it via a REST API, and serves a web UI.
 """
 
-from flask import Flask, render_template, jsonify
+import gzip
+import hashlib
+import json
+import os
+from typing import Any, Dict
+
+from flask import Blueprint, Flask, Response, render_template, request
 from process_agents.utils import (
-    load_full_process_context,
-    getProperty
+    load_indexed_process_context,
+    index_subprocesses,
+    getProperty,
+    PROJECT_ROOT,
 )
 
-import json
+try:
+    import orjson  # optional: faster serialisation of the process model
+except ImportError:
+    orjson = None
 
 import logging
 logger = logging.getLogger("ProcessArchitect.Apps")
@@ -24,22 +35,20 @@ app = Flask(
     static_url_path=''           # Serve static files at root URL
 )
 
-def build_process_model():
-    ctx = load_full_process_context()
-    if isinstance(ctx, str):
-        try:
-            ctx = json.loads(ctx)
-        except Exception:
-            ctx = {}
+# All routes live on one blueprint, registered with the app in a single pass below
+bp = Blueprint("process", __name__)
+
+def build_process_model() -> Dict[str, Any]:
+    """Flattens the master process and its subprocesses into the model the web UI renders."""
+    ctx = load_indexed_process_context()
 
     master = ctx.get("master_process", {})
     subprocesses = ctx.get("subprocesses", [])
 
-    # Index subprocesses by their parent step name
-    subprocess_index = {
-        sp.get("step_name"): sp.get("subprocess_flow", [])
-        for sp in subprocesses if sp.get("step_name")
-    }
+    # Subprocesses indexed by their parent step name (prebuilt when the context is loaded)
+    subprocess_index = ctx.get("subprocess_index")
+    if subprocess_index is None:
+        subprocess_index = index_subprocesses(subprocesses)
 
     return {
         # Core Identity
@@ -63,41 +72,208 @@ def build_process_model():
         "subprocess_index": subprocess_index,
     }
 
-@app.route("/")
+def _dump_bytes(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode("utf-8")
+
+# ---------------------------------------------------------------------
+# /api/process cache: the model only changes when the pipeline rewrites
+# output/process_data.json or a file under output/subprocesses
+# ---------------------------------------------------------------------
+MASTER_FILE = os.path.join(PROJECT_ROOT, "output", "process_data.json")
+SUBPROCESS_DIR = os.path.join(PROJECT_ROOT, "output", "subprocesses")
+# (key, payload, etag, gzip) for the last model served. Replaced as a whole, never
+# mutated, so a request reading it once always sees a consistent entry
+_PROCESS_CACHE = (None, None, None, None)
+# Smaller payloads are not worth compressing
+COMPRESS_MIN_SIZE = 1024
+
+def _process_files_key() -> tuple:
+    """(name, mtime_ns, size) for every file the process model is built from."""
+    key = []
+    try:
+        st = os.stat(MASTER_FILE)
+        key.append((MASTER_FILE, st.st_mtime_ns, st.st_size))
+    except OSError:
+        key.append((MASTER_FILE, None, None))
+    try:
+        with os.scandir(SUBPROCESS_DIR) as it:
+            for entry in it:
+                if entry.name.endswith(".json") and entry.is_file():
+                    st = entry.stat()
+                    key.append((entry.name, st.st_mtime_ns, st.st_size))
+    except OSError:
+        pass
+    return tuple(sorted(key, key=lambda item: item[0]))
+
+def process_etag(key: tuple) -> str:
+    """ETag derived from the file stats, so it is known before the body is serialised."""
+    return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+
+def stream_process_model(model: Dict[str, Any], key: tuple):
+    """
+    Yields the model as JSON one top-level key at a time, so the first bytes go out
+    while the larger sections (level1_steps, subprocess_index) are still being
+    serialised. The joined body is cached once the stream completes.
+    """
+    global _PROCESS_CACHE
+    chunks = [b"{"]
+    yield chunks[0]
+    for i, (name, value) in enumerate(model.items()):
+        chunk = (b"," if i else b"") + _dump_bytes(name) + b":" + _dump_bytes(value)
+        chunks.append(chunk)
+        yield chunk
+    chunks.append(b"}")
+    yield chunks[-1]
+    _PROCESS_CACHE = (key, b"".join(chunks), process_etag(key), None)
+
+def cached_gzip_payload(entry: tuple) -> bytes:
+    """gzip of the entry's payload, compressed once per payload version."""
+    global _PROCESS_CACHE
+    key, payload, etag, compressed = entry
+    if compressed is None:
+        compressed = gzip.compress(payload, compresslevel=6)
+        # Only attach it if no newer model has been cached in the meantime
+        if _PROCESS_CACHE is entry:
+            _PROCESS_CACHE = (key, payload, etag, compressed)
+    return compressed
+
+# index.html has no per-request content (only url_for() of static assets), so it is
+# rendered once and served from these bytes
+_INDEX_PAGE = {"body": None, "etag": None}
+
+def rendered_index() -> Dict[str, Any]:
+    """Renders index.html on first use and caches the bytes with their ETag."""
+    if _INDEX_PAGE["body"] is None:
+        body = render_template("index.html").encode("utf-8")
+        _INDEX_PAGE.update(body=body, etag=hashlib.blake2b(body, digest_size=8).hexdigest())
+    return _INDEX_PAGE
+
+@bp.route("/")
 def index():
     """
     Serves the main HTML page.
     """
-    return render_template("index.html")
+    page = rendered_index()
+    if request.if_none_match.contains(page["etag"]):
+        response = Response(status=304)
+    else:
+        response = Response(page["body"], mimetype="text/html")
+    response.set_etag(page["etag"])
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return response
+
+# Constant probe bodies, serialised once
+VERSION_BODY = _dump_bytes({"version": "1.0"})
+STATUS_BODY = _dump_bytes({"status": "live"})
 
 # Version GET handler
-@app.route("/version")
+@bp.route("/version")
 def version() -> Any:
-    return jsonify({"version":"1.0"})
+    response = Response(VERSION_BODY, mimetype="application/json")
+    response.headers["Cache-Control"] = "public, max-age=60"
+    return response
 
 # Status GET probe handler
-@app.route("/status")
+@bp.route("/status")
 def status() -> Any:
-    return jsonify({"status":"live"})
+    response = Response(STATUS_BODY, mimetype="application/json")
+    response.headers["Cache-Control"] = "no-store"
+    return response
 
-@app.route("/api/process")
+@bp.route("/api/process")
 def api_process():
     """
     API endpoint that returns the process model as JSON.
     """
-    return jsonify(build_process_model())
+    key = _process_files_key()
+    etag = process_etag(key)
+    # Clients that already hold this version (either encoding) get a 304 without the
+    # model being built
+    for candidate in (etag, etag + "-gz"):
+        if request.if_none_match.contains(candidate):
+            response = Response(status=304)
+            response.set_etag(candidate)
+            response.vary.add("Accept-Encoding")
+            return response
+
+    headers = {}
+    entry = _PROCESS_CACHE
+    if entry[0] == key:
+        body = entry[1]
+        # The JSON repeats the same keys throughout and compresses very well; the
+        # compressed body is cached with the raw one (streamed misses go out as-is)
+        if "gzip" in request.accept_encodings and len(body) >= COMPRESS_MIN_SIZE:
+            body = cached_gzip_payload(entry)
+            headers["Content-Encoding"] = "gzip"
+            etag += "-gz"
+    else:
+        body = stream_process_model(build_process_model(), key)
+    response = Response(body, mimetype="application/json", headers=headers)
+    response.set_etag(etag)
+    response.vary.add("Accept-Encoding")
+    return response
+
+app.register_blueprint(bp)
+# Build the URL map now rather than on the first request
+app.url_map.update()
+
+def serve_with_gunicorn(host: str, port: int) -> bool:
+    """
+    Runs the app under gunicorn with several worker processes (gevent workers when
+    gevent is installed, threaded workers otherwise). Returns False when gunicorn is
+    not installed (it is not available on Windows), so the caller can fall back.
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        return False
+
+    try:
+        import gevent  # noqa: F401
+        worker_class = "gevent"
+    except ImportError:
+        worker_class = "gthread"
+
+    options = {
+        "bind": f"{host}:{port}",
+        "workers": getProperty("workers", default=(os.cpu_count() or 1) * 2 + 1, cast=int),
+        "worker_class": worker_class,
+        "keepalive": 5,
+    }
+
+    class _GunicornApp(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    logger.debug(f"Serving with gunicorn: {options}")
+    _GunicornApp().run()
+    return True
 
 def main():
     """
     Entry point for running the Flask app.
-    Uses 0.0.0.0 for container/remote visibility.
+    Uses 0.0.0.0 for container/remote visibility. With debug off the app is served by
+    gunicorn when installed; debug mode (or no gunicorn) uses Flask's built-in server.
     """
     applicationName = getProperty("APP")
     logger.debug(f"Application {applicationName} running...")    
 
-    app.run(debug=getProperty("debug"), 
-            host=getProperty("host"), 
-            port=getProperty("port"))
+    debug = getProperty("debug")
+    host = getProperty("host")
+    port = getProperty("port")
+    if not debug and serve_with_gunicorn(host, port):
+        return
+
+    app.run(debug=debug, 
+            host=host, 
+            port=port,
+            threaded=True)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
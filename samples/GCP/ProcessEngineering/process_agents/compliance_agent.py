@@ -1,9 +1,5 @@
 # process_agents/compliance_agent.py
-from google.genai import types
-
 import logging
-import time
-import random
 
 logger = logging.getLogger("ProcessArchitect.Compliance")
 
@@ -11,31 +7,45 @@ from .utils import (
     load_master_process_json,
     load_iteration_feedback,
     save_iteration_feedback,
-    getProperty,
+    MODEL_PACER,
 )
 
-def log_compliance_metadata(status: str):
+async def log_compliance_metadata(status: str):
     """Internal tool to report status."""
-    time.sleep(float(getProperty("modelSleep")) + random.random() * 0.75)
-    logger.debug(f"Compliance Metadata - Status: {status},")
+    await MODEL_PACER.acquire_async()  # only waits when calls arrive faster than modelSleep allows
+    logger.debug("Compliance Metadata - Status: %s,", status)
     return {}
 
 # -----------------------------
 # COMPLIANCE AGENT DEFINITION
 # -----------------------------
-from .agent_wrappers import ProcessLlmAgent
-compliance_agent = ProcessLlmAgent(
-    name='Compliance_Review_Agent',
-    description='Audits processes against sector best practices.',
-    instruction_file="compliance_agent.txt",
-    tools=[
-        load_master_process_json,
-        save_iteration_feedback,
-        load_iteration_feedback,
-        log_compliance_metadata,
-    ],
-    generate_content_config=types.GenerateContentConfig(
+def build_compliance_agent():
+    from .agent_wrappers import ProcessLlmAgent
+
+    return ProcessLlmAgent(
+        name='Compliance_Review_Agent',
+        description='Audits processes against sector best practices.',
+        instruction_file="compliance_agent.txt",
+        tools=[
+            load_master_process_json,
+            save_iteration_feedback,
+            load_iteration_feedback,
+            log_compliance_metadata,
+        ],
         temperature=0.1,
         top_p=1,
-    ),
-)
+        parallel_tools=True,
+    )
+
+_compliance_agent = None
+
+def __getattr__(name: str):
+    # `compliance_agent` is built on first access (PEP 562): importing this module
+    # only for log_compliance_metadata does not construct the agent. The create and
+    # update pipelines still build it when they are assembled, since both use it
+    global _compliance_agent
+    if name == "compliance_agent":
+        if _compliance_agent is None:
+            _compliance_agent = build_compliance_agent()
+        return _compliance_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
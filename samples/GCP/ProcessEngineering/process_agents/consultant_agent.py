@@ -1,9 +1,5 @@
 # process_agents/consultant_agent.py
-from google.adk.tools.tool_context import ToolContext
-
-import time
 import logging
-import random
 
 from .utils import (
     load_full_process_context,
@@ -15,10 +11,23 @@ logger = logging.getLogger("ProcessArchitect.Consultant")
 # CONSULTANT AGENT
 # -----------------------------
 # Agent for providing expert advice on process design
-from .agent_wrappers import ProcessLlmAgent
-consultant_agent = ProcessLlmAgent(
-    name="Consultant_Agent",
-    description="Use this for questions about EXISTING processes. It cannot create new ones.",
-    instruction_file="consultant_agent.txt",
-    tools=[load_full_process_context],
-)
\ No newline at end of file
+def build_consultant_agent():
+    from .agent_wrappers import ProcessLlmAgent
+
+    return ProcessLlmAgent(
+        name="Consultant_Agent",
+        description="Use this for questions about EXISTING processes. It cannot create new ones.",
+        instruction_file="consultant_agent.txt",
+        tools=[load_full_process_context],
+    )
+
+_consultant_agent = None
+
+def __getattr__(name: str):
+    # `consultant_agent` is built on first access (PEP 562)
+    global _consultant_agent
+    if name == "consultant_agent":
+        if _consultant_agent is None:
+            _consultant_agent = build_consultant_agent()
+        return _consultant_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
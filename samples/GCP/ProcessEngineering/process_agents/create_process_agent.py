@@ -2,7 +2,7 @@
 
 # Standard / third-party imports
 from webbrowser import get
-from google.adk.agents import LoopAgent, SequentialAgent  # core agent orchestrators
+from google.adk.agents import ParallelAgent, SequentialAgent  # core agent orchestrators
 from google.adk.tools.tool_context import ToolContext
 from google.genai import types
 import time
@@ -15,7 +15,7 @@ from typing import Any
 
 # Import sub-agents (each is defined in sibling modules)
 from .analysis_agent import analysis_agent
-from .design_agent import design_agent as design_agent
+from .design_agent import make_design_instance
 from .compliance_agent import compliance_agent
 from .json_normalizer_agent import json_normalizer_agent
 from .json_review_agent import json_review_agent
@@ -30,121 +30,123 @@ from .utils import (
 from .utils_agent import (
     mute_agent,
     unmute_agent,
-    stop_controller_agent
+    stop_controller_agent,
+    approvals_ready,
+    APPROVAL_PATH,
+    GROUNDING_ENABLED,
 )
 
 # Wrapper classes that adapt LLM agents into the process pipeline
-from .agent_wrappers import ProcessLlmAgent, ProcessAgent
+from .agent_wrappers import (
+    ConvergenceLoop,
+    SemanticStoppingLoop,
+    StallAwareLoop,
+)
 
 logger = logging.getLogger("ProcessArchitect.CreateProcessPipeline")
 
 # ------------------------- PIPELINE DEFINITION -------------------------
 # Safe timebox for loops: read configurable value or fall back to a conservative default.
-SAFE_LOOP_ITERS = int(getProperty("loopIterations", default=2))
-
-# ---------- Existing design agents ----------
-# Create a ProcessLlmAgent wrapper instance for the design agent (keeps LLM-specific behaviour)
-design_instance = ProcessLlmAgent(
-    name=design_agent.name + '_Design_Instance',
-    model=design_agent.model,
-    description=design_agent.description,
-    instruction=design_agent.instruction,
-    tools=design_agent.tools,
-    generate_content_config=design_agent.generate_content_config,
-    output_key=design_agent.output_key,
-    before_model_callback=design_agent.before_model_callback,
-    after_model_callback=design_agent.after_model_callback,
-)
-
-# Create additional ProcessAgent instances used in various loop roles (compliance, simulation, grounding)
-design_compliance_instance = ProcessAgent(
-    name=design_agent.name + '_Compliance_Instance',
-    model=design_agent.model,
-    description=design_agent.description,
-    instruction=design_agent.instruction,
-    tools=design_agent.tools,
-    output_key=design_agent.output_key,
-    before_model_callback=design_agent.before_model_callback,
-    after_model_callback=design_agent.after_model_callback,
-)
-
-design_simulation_instance = ProcessAgent(
-    name=design_agent.name + '_Simulation_Instance',
-    model=design_agent.model,
-    description=design_agent.description,
-    instruction=design_agent.instruction,
-    tools=design_agent.tools,
-    output_key=design_agent.output_key,
-    before_model_callback=design_agent.before_model_callback,
-    after_model_callback=design_agent.after_model_callback,
-)
-
-design_grounding_instance = ProcessAgent(
-    name=design_agent.name + '_Grounding_Instance',
-    model=design_agent.model,
-    description=design_agent.description,
-    instruction=design_agent.instruction,
-    tools=design_agent.tools,
-    output_key=design_agent.output_key,
-    before_model_callback=design_agent.before_model_callback,
-    after_model_callback=design_agent.after_model_callback,
-)
+SAFE_LOOP_ITERS = getProperty("loopIterations", default=2, cast=int)
+# Stop the design loop early once consecutive designs are semantically unchanged
+SEMANTIC_LOOP_STOP = getProperty("enableSemanticLoopStop", default=True)
+CONVERGENCE_THRESHOLD = getProperty("convergenceThreshold", default=0.98, cast=float)
+CONVERGENCE_PATIENCE = getProperty("convergencePatience", default=1, cast=int)
+# Stop the normalization loop once the normalized JSON stops changing
+NORMALIZER_STALL_ROUNDS = getProperty("normalizerStallRounds", default=1, cast=int)
+
+# The compliance, simulation and grounding audits only read the current design and report
+# through save_iteration_feedback, so they can run side by side (enableParallelAudits)
+# before one design pass revises against the combined feedback: two design calls per
+# iteration instead of four
+PARALLEL_AUDITS = getProperty("enableParallelAudits", default=True)
+logger.debug(f"Design loop audits run {'in PARALLEL' if PARALLEL_AUDITS else 'SEQUENTIALLY'}.")
 
 # ---------- Add Stop_Controller FIRST in the loop stage ----------
-# Assemble sub-agents for the iterative design-compliance loop
-sub_agents = [
-    design_instance,
-    compliance_agent,
-    design_compliance_instance,
-    simulation_agent,
-    design_simulation_instance,
-]
+# Grounding agents are optional (enableGroundingAgent, resolved once in utils_agent)
+logger.debug(f"Grounding agent {'ENABLED' if GROUNDING_ENABLED else 'DISABLED'} in design loop.")
 
-# Optionally include grounding agents based on configuration
-if getProperty("enableGroundingAgent", default="true"):
-    logger.debug("Grounding agent ENABLED in design loop.")
-    sub_agents += [
-        grounding_agent,
-        design_grounding_instance,
-    ]
+# ---------- Existing design agents ----------
+# One design agent per loop role, all sharing design_agent's configuration. Only the
+# roles the chosen loop layout uses are built; the others stay None
+design_instance = make_design_instance('Design_Instance')
+design_compliance_instance = None
+design_simulation_instance = None
+design_grounding_instance = None
+design_revision_instance = None
+if PARALLEL_AUDITS:
+    # The auditors' findings arrive as one merged feedback batch, which a single design
+    # pass addresses instead of one pass per auditor
+    design_revision_instance = make_design_instance('Revision_Instance')
 else:
-    logger.debug("Grounding agent DISABLED in design loop.")
-
-# Always append the stop controller to allow early termination of the loop
-sub_agents.append(stop_controller_agent)
-
-# Define a looped stage that runs the design/compliance sequence up to SAFE_LOOP_ITERS times
-review_loop = LoopAgent(
-    name="Design_Compliance_Loop",
-    sub_agents=[
-        SequentialAgent(
-            name="Iterative_Design_Stage",
-            sub_agents=sub_agents,
+    design_compliance_instance = make_design_instance('Compliance_Instance')
+    design_simulation_instance = make_design_instance('Simulation_Instance')
+    if GROUNDING_ENABLED:
+        design_grounding_instance = make_design_instance('Grounding_Instance')
+
+# Sub-agents for the iterative design-compliance loop, assembled once; the stop
+# controller always comes last to allow early termination of the loop
+if PARALLEL_AUDITS:
+    sub_agents = (
+        design_instance,
+        ParallelAgent(
+            name="Parallel_Audit_Stage",
+            sub_agents=[
+                compliance_agent,
+                simulation_agent,
+                *((grounding_agent,) if GROUNDING_ENABLED else ()),
+            ],
         ),
-    ],
-    max_iterations=SAFE_LOOP_ITERS
-)
+        design_revision_instance,
+        stop_controller_agent,
+    )
+else:
+    sub_agents = (
+        design_instance,
+        compliance_agent,
+        design_compliance_instance,
+        simulation_agent,
+        design_simulation_instance,
+        *((grounding_agent, design_grounding_instance) if GROUNDING_ENABLED else ()),
+        stop_controller_agent,
+    )
 
-# Wrap the stop controller as a ProcessAgent for use in other sequences (e.g., JSON review)
-json_stop_agent = ProcessAgent(
-    name="JSON_Review_Stop_Controller",
-    model=stop_controller_agent.model,
-    description=stop_controller_agent.description,
-    instruction=stop_controller_agent.instruction,
-    tools=stop_controller_agent.tools,
-    output_key=stop_controller_agent.output_key,
-    before_model_callback=stop_controller_agent.before_model_callback,
-    after_model_callback=stop_controller_agent.after_model_callback,
-)
+# Define a looped stage that runs the design/compliance sequence up to SAFE_LOOP_ITERS times
+# The loop runs its sub-agents in order on every iteration itself, so they are handed
+# to it directly instead of through an intermediate SequentialAgent
+if SEMANTIC_LOOP_STOP:
+    review_loop = SemanticStoppingLoop(
+        name="Design_Compliance_Loop",
+        sub_agents=sub_agents,
+        max_iterations=SAFE_LOOP_ITERS,
+        similarity_threshold=CONVERGENCE_THRESHOLD,
+        patience=CONVERGENCE_PATIENCE,
+        ready_check=approvals_ready,
+        ready_file=APPROVAL_PATH,
+    )
+else:
+    # No convergence tracking (patience=0), but the approval.json watch still applies
+    review_loop = ConvergenceLoop(
+        name="Design_Compliance_Loop",
+        sub_agents=sub_agents,
+        max_iterations=SAFE_LOOP_ITERS,
+        patience=0,
+        ready_check=approvals_ready,
+        ready_file=APPROVAL_PATH,
+    )
+
+# Separate stop controller instance for the JSON review loop (one parent per agent)
+json_stop_agent = stop_controller_agent.shallow_clone("JSON_Review_Stop_Controller")
 
 # JSON Normalization pipeline: normalize, review (with stop), then write JSON output
 json_normalization_loop = SequentialAgent(
     name="JSON_Normalization_Retry_Loop",
     sub_agents=[
-        LoopAgent(
+        StallAwareLoop(
             name="Normalizer_Review_Sequence",
             sub_agents=[json_normalizer_agent, json_review_agent, json_stop_agent],
-            max_iterations=SAFE_LOOP_ITERS
+            max_iterations=SAFE_LOOP_ITERS,
+            patience=NORMALIZER_STALL_ROUNDS,
         ),
         json_writer_agent
     ],
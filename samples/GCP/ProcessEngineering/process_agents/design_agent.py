@@ -1,15 +1,11 @@
 # process_agents/design_agent.py
-from google.genai import types
 
-import time
 import logging
-import random
 
 from .utils import (
     persist_final_json,
     load_iteration_feedback,
     load_master_process_json,
-    getProperty,
     validate_process_json,
     load_process_template
 )
@@ -18,8 +14,7 @@ logger = logging.getLogger("ProcessArchitect.Design")
 
 def log_design_metadata(process_name: str, goal_count: int):
     """Internal tool to track design progress."""
-    time.sleep(float(getProperty("modelSleep")) + random.random() * 0.75)
-    logger.debug(f"Design Metadata - Process: {process_name}, Goals Identified: {goal_count}.")
+    logger.debug("Design Metadata - Process: %s, Goals Identified: %s.", process_name, goal_count)
     return f"Design started for {process_name} with {goal_count} identified objectives."
 
 # -----------------------------
@@ -38,7 +33,14 @@ design_agent = ProcessLlmAgent(
         validate_process_json,
         load_process_template,
     ],
-    generate_content_config=types.GenerateContentConfig(
-        temperature=0.2
-    ),
+    temperature=0.2,
+    parallel_tools=True,
 )
+
+def make_design_instance(suffix: str):
+    """
+    Returns a copy of design_agent named Design_Agent_<suffix>. Every loop role needs its
+    own agent (ADK agents can only have one parent), but they share the instruction, tools,
+    config and callbacks of design_agent rather than rebuilding them.
+    """
+    return design_agent.shallow_clone(f"{design_agent.name}_{suffix}")
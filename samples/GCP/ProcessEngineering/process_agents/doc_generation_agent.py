@@ -4,7 +4,7 @@ import docx
 from docx.shared import Inches, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 
-from .utils import getProperty
+from .utils import getProperty, read_json_file
 
 import os
 import json
@@ -145,7 +145,7 @@ def create_standard_doc_from_file(process_name: str) -> str:
     """
     Generate a structured, ISO-formatted process document from process_data.json.
     """
-    time.sleep(float(getProperty("modelSleep")) + random.random() * 0.75)
+    time.sleep(getProperty("modelSleep", cast=float) + random.random() * 0.75)
     logger.debug(f"Creating document for process: {process_name}...")
 
     try:
@@ -290,8 +290,7 @@ def create_standard_doc_from_file(process_name: str) -> str:
         try:
             sim_path = "output/simulation_results.json"
             if os.path.exists(sim_path):
-                with open(sim_path, "r", encoding="utf-8") as sf:
-                    simulation_results = json.load(sf)
+                simulation_results = read_json_file(sim_path)
         except Exception:
             traceback.print_exc()
 
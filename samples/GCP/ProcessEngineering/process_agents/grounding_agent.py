@@ -15,7 +15,6 @@ from pathlib import Path
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from google.adk.agents import LlmAgent
-from google.genai import types
 from google.adk.tools.tool_context import ToolContext
 
 # NEW: import urllib3 and the warning class for conditional suppression
@@ -75,7 +74,7 @@ class JitterAdapter(HTTPAdapter):
     """
     def sleep(self, sleep_time: float):
         try:
-            base = float(getProperty("modelSleep", default=0.25))  # your pattern baseline
+            base = getProperty("modelSleep", default=0.25, cast=float)  # your pattern baseline
         except Exception:
             base = 0.25
         jitter = random.random() * 0.75  # your pattern jitter
@@ -125,7 +124,7 @@ def perform_openapi_call(tool_context: ToolContext, request_json: str):
     """
     Executes an OpenAPI call based on a JSON request string.
     """
-    time.sleep(float(getProperty("modelSleep")) + random.random() * 0.75)
+    time.sleep(getProperty("modelSleep", cast=float) + random.random() * 0.75)
 
     try:
         request = json.loads(request_json)
@@ -172,7 +171,7 @@ def perform_openapi_call(tool_context: ToolContext, request_json: str):
         except ValueError:
             data = {"raw": resp.text, "content_type": resp.headers.get("Content-Type", "")}
 
-        logger.debug(f"Request callout: {request_json}")
+        logger.debug("Request callout: %s", request_json)
         logger.debug(json.dumps(data, indent=2))
         return {"ok": True, "data": data}
 
@@ -181,7 +180,7 @@ def perform_openapi_call(tool_context: ToolContext, request_json: str):
         if allow_insecure:
             logger.warning("TLS verification failed. Retrying with verify=False (INSECURE!)")
             try:
-                time.sleep(float(getProperty("modelSleep")) + random.random() * 0.75)
+                time.sleep(getProperty("modelSleep", cast=float) + random.random() * 0.75)
                 if method == "GET":
                     resp = session.get(url, params=params, timeout=timeout, verify=False)
                 else:
@@ -199,7 +198,7 @@ def perform_openapi_call(tool_context: ToolContext, request_json: str):
         return {"ok": False, "error": f"TLS verification failed: {ssl_err}"}
 
     except Exception as e:
-        time.sleep(float(getProperty("modelSleep")) + random.random() * 0.75)
+        time.sleep(getProperty("modelSleep", cast=float) + random.random() * 0.75)
         logger.error(f"Perform OpenAPI call error: {e}")
         return {"ok": False, "error": str(e)}
 
@@ -218,8 +217,7 @@ grounding_agent = ProcessLlmAgent(
         perform_openapi_call,
     ],
     instruction_file="grounding_agent.txt",
-    generate_content_config=types.GenerateContentConfig(
-        temperature=0.1,
-        top_p=1,
-    ),
+    temperature=0.1,
+    top_p=1,
+    parallel_tools=True,
 )
\ No newline at end of file
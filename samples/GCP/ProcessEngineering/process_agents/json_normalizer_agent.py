@@ -1,26 +1,20 @@
-from google.genai import types
-
 from .utils import (
     load_master_process_json,
     persist_final_json,
     load_process_template,
     load_iteration_feedback,
-    getProperty,
 )
 
 import json
 import logging
 from typing import Any
 
-import time
-import random 
 
 logger = logging.getLogger("ProcessArchitect.JsonNormalizer")
 
 def log_normalization_metadata(goal_count: int):
     """Internal tool to track extraction progress and CLEAN environment."""
-    time.sleep(float(getProperty("modelSleep")) + random.random() * 0.75)
-    logger.debug(f"Normalization Metadata - Goals Identified: {goal_count}.")
+    logger.debug("Normalization Metadata - Goals Identified: %s.", goal_count)
     return f"JSON Normalization started with {goal_count} identified objectives."
 
 # -----------------------------
@@ -39,8 +33,6 @@ json_normalizer_agent = ProcessLlmAgent(
     include_contents="default",
     description="Normalizes arbitrary business process JSON into a stable enriched schema.",
     instruction_file="json_normalizer_agent.txt",
-    generate_content_config=types.GenerateContentConfig(
-        temperature=0.1,
-        top_p=1,
-    ),
+    temperature=0.1,
+    top_p=1,
 )
\ No newline at end of file
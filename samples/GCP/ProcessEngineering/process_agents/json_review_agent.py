@@ -1,27 +1,22 @@
 # process_agents/json_review_agent.py
 
-from google.genai import types
 from google.adk.tools.tool_context import ToolContext
 
 from .utils import (
     load_master_process_json,
     load_iteration_feedback,
     save_iteration_feedback,
-    getProperty,
     load_process_template
 )
 
 import json
 import logging
-import time
-import random
 
 logger = logging.getLogger("ProcessArchitect.JsonReview")
 
 def log_review_metadata(goal_count: int):
     """Internal tool to track extraction progress and CLEAN environment."""
-    time.sleep(float(getProperty("modelSleep")) + random.random() * 0.75)
-    logger.debug(f"Review Metadata - Goals Identified: {goal_count}.")
+    logger.debug("Review Metadata - Goals Identified: %s.", goal_count)
     return f"JSON Review started with {goal_count} identified objectives."
 
 def exit_loop(tool_context: ToolContext):
@@ -47,8 +42,6 @@ json_review_agent = ProcessLlmAgent(
         load_process_template,
     ],
     instruction_file="json_review_agent.txt",
-    generate_content_config=types.GenerateContentConfig(
-        temperature=0.1,
-        top_p=1,
-    ),
+    temperature=0.1,
+    top_p=1,
 )
@@ -7,12 +7,11 @@ import re
 from statistics import mean, pstdev
 from typing import Dict, Any
 
-from google.genai import types
-
 from .utils import (
     load_master_process_json,
     save_iteration_feedback,
     getProperty,
+    write_json_file,
 )
 
 import time
@@ -60,7 +59,7 @@ def _extract_valid_json(raw: str):
         raises ValueError otherwise
     """
     raw = raw.strip()
-    logger.debug(f"Raw LLM output received for simulation (first 5000 chars): {raw[:5000]}")
+    logger.debug("Raw LLM output received for simulation (first 5000 chars): %.5000s", raw)
 
     stack = []
     start_idx = None
@@ -330,9 +329,8 @@ def _persist_simulation_metrics(metrics: Dict[str, Any]) -> None:
     try:
         import os
         os.makedirs("output", exist_ok=True)
-        with open(SIM_RESULTS_PATH, "w", encoding="utf-8") as f:
-            json.dump(metrics, f, indent=2, ensure_ascii=False)
-        logger.debug(f"Simulation metrics saved to {SIM_RESULTS_PATH}")
+        write_json_file(SIM_RESULTS_PATH, metrics)
+        logger.debug("Simulation metrics saved to %s", SIM_RESULTS_PATH)
     except Exception:
         logger.exception("Failed to persist simulation metrics.")
 
@@ -343,7 +341,7 @@ def _persist_process_data(data: Dict[str, Any]) -> None:
         os.makedirs("output", exist_ok=True)
         with open(PROCESS_JSON, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
-        logger.debug(f"Process data saved to {PROCESS_JSON}")
+        logger.debug("Process data saved to %s", PROCESS_JSON)
     except Exception:
         logger.exception("Failed to persist process data.")
 
@@ -381,7 +379,7 @@ def simulate_scenario(process_json_str: str, scenario_json_str: str) -> str:
     """
     Simulates a process scenario by applying overrides and running the core simulation.
     """
-    time.sleep(float(getProperty("modelSleep")) + random.random() * 0.75)
+    time.sleep(getProperty("modelSleep", cast=float) + random.random() * 0.75)
     try:
         data = json.loads(process_json_str)
         scenario = json.loads(scenario_json_str)
@@ -441,11 +439,10 @@ simulation_agent = ProcessLlmAgent(
         save_iteration_feedback,
         simulate_process_performance
     ],
-    generate_content_config=types.GenerateContentConfig(
-        temperature=0.1,
-        top_p=1,
-    ),
+    temperature=0.1,
+    top_p=1,
     instruction_file="simulation_agent.txt",
+    parallel_tools=True,
 )
 
 simulation_query_agent = ProcessLlmAgent(
@@ -456,9 +453,7 @@ simulation_query_agent = ProcessLlmAgent(
         simulate_process_performance,
         perform_sensitivity_analysis,
     ],
-    generate_content_config=types.GenerateContentConfig(
-        temperature=0.2,
-        top_p=1,
-    ),
+    temperature=0.2,
+    top_p=1,
     instruction_file="simulation_query_agent.txt",
 )
\ No newline at end of file
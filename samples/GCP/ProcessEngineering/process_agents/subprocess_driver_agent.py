@@ -19,6 +19,9 @@ import logging
 
 logger = logging.getLogger("ProcessArchitect.SubProcessDriverAgent")
 
+# Maximum number of process steps generated at the same time
+MAX_CONCURRENCY = getProperty("subprocessConcurrency", default=4, cast=int)
+
 # IMPORTANT:
 # We now import FACTORY FUNCTIONS instead of singletons.
 from .subprocess_generator_agent import build_subprocess_generator_agent
@@ -79,46 +82,41 @@ class SubprocessDriverAgent(BaseAgent):
         return steps
 
     # ---------------------------------------------------------
-    # Main execution
+    # Per-step context
     # ---------------------------------------------------------
-    @override
-    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
-        try:
-            steps = self._load_process_steps()
-        except Exception as e:
-            yield Event(
-                author=self.name,
-                content=types.Content(
-                    role="model",
-                    parts=[types.Part(text=f"Subprocess Error: {str(e)}")]
-                )
-            )
-            return
-
-        if not steps:
-            logger.debug("No process_steps found; skipping subprocess generation.")
-            if False:
-                yield
-            return
-
-        for step in steps:
-            step_name = step.get("step_name", "Unnamed Step")
-            logger.debug(f"Generating subprocess for step: {step_name}")
+    def _step_context(self, ctx: InvocationContext, step: Dict[str, Any]) -> InvocationContext:
+        """
+        Give each step its own view of session state so concurrent steps
+        do not overwrite each other's current_process_step / current_subprocess_flow.
+        """
+        step_name = step.get("step_name", "Unnamed Step")
+        state = dict(ctx.session.state)
+        state["current_process_step"] = step
+        session = ctx.session.model_copy(update={"state": state})
+        branch = f"{ctx.branch}.{self.name}.{step_name}" if ctx.branch else f"{self.name}.{step_name}"
+        return ctx.model_copy(update={"session": session, "branch": branch})
 
-            # Store the current step in shared session state
-            ctx.session.state["current_process_step"] = step
+    # ---------------------------------------------------------
+    # Generate and write the subprocess for one step
+    # ---------------------------------------------------------
+    async def _run_step(
+        self, ctx: InvocationContext, step: Dict[str, Any], semaphore: asyncio.Semaphore
+    ) -> bool:
+        step_name = step.get("step_name", "Unnamed Step")
+        async with semaphore:
+            logger.debug("Generating subprocess for step: %s", step_name)
+            step_ctx = self._step_context(ctx, step)
 
             # Rate‑limit padding
-            await asyncio.sleep(float(getProperty("modelSleep")) + random.random() * 0.75)
+            await asyncio.sleep(getProperty("modelSleep", cast=float) + random.random() * 0.75)
 
             # ---------------------------------------------------------
             # RUN GENERATOR (sub-agent 0) AND CAPTURE ITS OUTPUT
             # ---------------------------------------------------------
             generator_agent = self.per_step_pipeline.sub_agents[0]
-            await asyncio.sleep(float(getProperty("modelSleep")) + random.random() * 0.75)
 
             flow = None
-            async for event in generator_agent.run_async(ctx):
+            async for event in generator_agent.run_async(step_ctx):
                 if event.author == generator_agent.name:
                     if event.content and event.content.parts:
                         raw = event.content.parts[0].text
@@ -129,18 +127,54 @@ class SubprocessDriverAgent(BaseAgent):
 
             if not flow:
                 logger.error(f"[{self.name}] Generator produced no subprocess flow for step '{step_name}'.")
-                continue
+                return False
 
-            # Store the generated subprocess flow in shared session state
-            ctx.session.state["current_subprocess_flow"] = flow
+            # Store the generated subprocess flow in this step's state
+            step_ctx.session.state["current_subprocess_flow"] = flow
 
             # ---------------------------------------------------------
             # RUN WRITER (sub-agent 1)
             # ---------------------------------------------------------
-            await asyncio.sleep(float(getProperty("modelSleep")) + random.random() * 0.75)
             writer_agent = self.per_step_pipeline.sub_agents[1]
-            async for _ in writer_agent.run_async(ctx):
+            async for _ in writer_agent.run_async(step_ctx):
                 pass
+            return True
+
+    # ---------------------------------------------------------
+    # Main execution
+    # ---------------------------------------------------------
+    @override
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        try:
+            steps = self._load_process_steps()
+        except Exception as e:
+            yield Event(
+                author=self.name,
+                content=types.Content(
+                    role="model",
+                    parts=[types.Part(text=f"Subprocess Error: {str(e)}")]
+                )
+            )
+            return
+
+        if not steps:
+            logger.debug("No process_steps found; skipping subprocess generation.")
+            if False:
+                yield
+            return
+
+        # Steps are independent, so fan them out under a bounded semaphore.
+        # subprocessConcurrency=1 restores the original one-at-a-time behaviour.
+        semaphore = asyncio.Semaphore(max(1, MAX_CONCURRENCY))
+        # return_exceptions: a failing step is logged like an empty flow instead of
+        # aborting the driver while its sibling steps carry on writing unobserved
+        results = await asyncio.gather(
+            *(self._run_step(ctx, step, semaphore) for step in steps),
+            return_exceptions=True,
+        )
+        for step, result in zip(steps, results):
+            if isinstance(result, BaseException):
+                logger.error(f"[{self.name}] Subprocess generation failed for step '{step.get('step_name', 'Unnamed Step')}': {result}")
 
         logger.debug("Subprocess generation completed for all steps.")
         
@@ -8,8 +8,6 @@ from .utils import (
     getProperty
 )
 
-from google.genai import types
-
 MODEL = getProperty("MODEL")
 
 # -----------------------------
@@ -75,11 +73,9 @@ from .agent_wrappers import ProcessLlmAgent
 def build_subprocess_generator_agent():
     return ProcessLlmAgent(
             name="Subprocess_Generator_Agent",
-            generate_content_config=types.GenerateContentConfig(
-                temperature=0.1, # Lowered to 0.1 for maximum structural stability
-                top_p=0.9,
-                response_mime_type="application/json",
-            ),
+            temperature=0.1, # Lowered to 0.1 for maximum structural stability
+            top_p=0.9,
+            response_mime_type="application/json",
             instruction_file="subprocess_generator_agent.txt",
             input_schema=None,
             output_schema=SubprocessFlow,
@@ -58,7 +58,7 @@ class SubprocessWriterAgent(BaseAgent):
         os.makedirs(output_dir, exist_ok=True)
 
         output_path = os.path.join(output_dir, f"{step_name}.json")
-        await asyncio.sleep(float(getProperty("modelSleep")) + random.random() * 0.75)
+        await asyncio.sleep(getProperty("modelSleep", cast=float) + random.random() * 0.75)
 
         # ---------------------------------------------------------
         # Write the subprocess flow to disk
@@ -1,6 +1,6 @@
 # process_agents/update_process_agent.py
 import logging
-from google.adk.agents import LoopAgent, SequentialAgent  # wrappers replace direct LlmAgent/Agent usage
+from google.adk.agents import ParallelAgent, SequentialAgent  # wrappers replace direct LlmAgent/Agent usage
 from .utils import (
     load_full_process_context,
     getProperty,
@@ -8,7 +8,7 @@ from .utils import (
 )
 
 # Import the base agents to access their configuration
-from .design_agent import design_agent
+from .design_agent import make_design_instance
 from .compliance_agent import compliance_agent
 from .utils import load_iteration_feedback
 from .json_normalizer_agent import json_normalizer_agent
@@ -21,39 +21,28 @@ from .subprocess_driver_agent import SubprocessDriverAgent
 from .utils_agent import (
     mute_agent,
     unmute_agent,
-    stop_controller_agent
+    stop_controller_agent,
+    approvals_ready,
+    APPROVAL_PATH,
+    GROUNDING_ENABLED,
 )
 
 # NEW: wrapper imports
-from .agent_wrappers import ProcessLlmAgent, ProcessAgent
+from .agent_wrappers import (
+    ProcessLlmAgent,
+    ProcessAgent,
+    ConvergenceLoop,
+    SemanticStoppingLoop,
+    StallAwareLoop,
+)
 
 logger = logging.getLogger("ProcessArchitect.UpdateProcessPipeline")
 
 # ------------------------ UPDATE PIPELINE DEFINITION ------------------------
 
-mute_agent_instance = ProcessAgent(
-    name=mute_agent.name + "_Update",
-    model=mute_agent.model,
-    description=mute_agent.description,
-    instruction=mute_agent.instruction,
-    tools=mute_agent.tools,
-)
-
-unmute_agent_instance = ProcessAgent(
-    name=unmute_agent.name + "_Update",
-    model=unmute_agent.model,
-    description=unmute_agent.description,
-    instruction=unmute_agent.instruction,
-    tools=unmute_agent.tools,
-)
-
-stop_controller_agent_instance = ProcessAgent(
-    name=stop_controller_agent.name + "_Update",
-    model=stop_controller_agent.model,
-    description=stop_controller_agent.description,
-    instruction=stop_controller_agent.instruction,
-    tools=stop_controller_agent.tools,
-)
+mute_agent_instance = mute_agent.shallow_clone(mute_agent.name + "_Update")
+unmute_agent_instance = unmute_agent.shallow_clone(unmute_agent.name + "_Update")
+stop_controller_agent_instance = stop_controller_agent.shallow_clone(stop_controller_agent.name + "_Update")
 
 # ---------------------------------------------------------
 # STAGE 1: CONTEXT-AWARE ANALYSIS
@@ -73,19 +62,9 @@ update_analysis_agent = ProcessLlmAgent(
 
 # ---------------------------------------------------------
 # STAGE 2-6: UNIQUE INSTANCES FOR UPDATE PIPELINE
-# Explicit clones (no clone_agent helper)
+# Design agents come from make_design_instance(); the others are explicit clones
 # ---------------------------------------------------------
-design_inst = ProcessLlmAgent(
-    name=design_agent.name + "_Update",
-    model=design_agent.model,
-    description=design_agent.description,
-    instruction=design_agent.instruction,
-    tools=design_agent.tools,
-    generate_content_config=design_agent.generate_content_config,
-    output_key=design_agent.output_key,
-    before_model_callback=design_agent.before_model_callback,
-    after_model_callback=design_agent.after_model_callback
-)
+design_inst = make_design_instance("Update")
 
 compliance_inst = ProcessLlmAgent(
     name=compliance_agent.name + "_Update",
@@ -96,7 +75,8 @@ compliance_inst = ProcessLlmAgent(
     output_key=compliance_agent.output_key,
     generate_content_config=compliance_agent.generate_content_config,
     before_model_callback=compliance_agent.before_model_callback,
-    after_model_callback=compliance_agent.after_model_callback
+    after_model_callback=compliance_agent.after_model_callback,
+    parallel_tools=True,
 )
 
 simulation_inst = ProcessLlmAgent(
@@ -108,7 +88,8 @@ simulation_inst = ProcessLlmAgent(
     output_key=simulation_agent.output_key,
     generate_content_config=simulation_agent.generate_content_config,
     before_model_callback=simulation_agent.before_model_callback,
-    after_model_callback=simulation_agent.after_model_callback
+    after_model_callback=simulation_agent.after_model_callback,
+    parallel_tools=True,
 )
 
 normalizer_inst = ProcessLlmAgent(
@@ -150,28 +131,6 @@ writer_inst = ProcessAgent(
     after_model_callback=json_writer_agent.after_model_callback
 )
 
-design_simulation_inst = ProcessAgent(
-    name=design_agent.name + "_Simulation_Update",
-    model=design_agent.model,
-    description=design_agent.description,
-    instruction=design_agent.instruction,
-    tools=design_agent.tools,
-    output_key=design_agent.output_key,
-    before_model_callback=design_agent.before_model_callback,
-    after_model_callback=design_agent.after_model_callback,
-)
-
-design_grounding_inst = ProcessAgent(
-    name=design_agent.name + "_Grounding_Update",
-    model=design_agent.model,
-    description=design_agent.description,
-    instruction=design_agent.instruction,
-    tools=design_agent.tools,
-    output_key=design_agent.output_key,
-    before_model_callback=design_agent.before_model_callback,
-    after_model_callback=design_agent.after_model_callback,
-)
-
 grounding_inst = ProcessLlmAgent(
     name=grounding_agent.name + "_Update",
     model=grounding_agent.model,
@@ -182,76 +141,95 @@ grounding_inst = ProcessLlmAgent(
     generate_content_config=grounding_agent.generate_content_config,
     before_model_callback=grounding_agent.before_model_callback,
     after_model_callback=grounding_agent.after_model_callback,
+    parallel_tools=True,
 )
 
 # Subprocess driver is NOT an LlmAgent — clone manually (BaseAgent)
 subprocess_inst = SubprocessDriverAgent(name="Subprocess_Driver_Agent_Update")
 
-# Specialized instance for internal compliance logic (lightweight Agent)
-design_compliance_inst = ProcessAgent(
-    name=design_agent.name + "_Compliance_Update_Review",
-    model=design_agent.model,
-    instruction=design_agent.instruction,
-    output_key=design_agent.output_key,
-    tools=design_agent.tools,
-    before_model_callback=design_agent.before_model_callback,
-    after_model_callback=design_agent.after_model_callback,
-)
 
 # ---------------------------------------------------------
 # RE-ASSEMBLE THE UPDATE PIPELINE
 # ---------------------------------------------------------
 # Safe timebox for loops: read configurable value or fall back to a conservative default.
-SAFE_LOOP_ITERS = int(getProperty("loopIterations", default=2))
+SAFE_LOOP_ITERS = getProperty("loopIterations", default=2, cast=int)
+# Stop the design loop early once consecutive designs are semantically unchanged
+SEMANTIC_LOOP_STOP = getProperty("enableSemanticLoopStop", default=True)
+CONVERGENCE_THRESHOLD = getProperty("convergenceThreshold", default=0.98, cast=float)
+CONVERGENCE_PATIENCE = getProperty("convergencePatience", default=1, cast=int)
+# Stop the normalization loop once the normalized JSON stops changing
+NORMALIZER_STALL_ROUNDS = getProperty("normalizerStallRounds", default=1, cast=int)
+
+# Auditors run side by side when enableParallelAudits is set, followed by one design
+# revision over their combined feedback (see create_process_agent)
+PARALLEL_AUDITS = getProperty("enableParallelAudits", default=True)
+logger.debug(f"Grounding agent {'ENABLED' if GROUNDING_ENABLED else 'DISABLED'} in design loop.")
 
 # ---------- Add Stop_Controller FIRST in the loop stage ----------
-sub_update_agents = [
-    design_inst,
-    compliance_inst,
-    design_compliance_inst,
-    simulation_inst,
-    design_simulation_inst,
-]
-if getProperty("enableGroundingAgent", default="true"):
-    logger.debug("Grounding agent ENABLED in design loop.")
-    sub_update_agents += [
-        grounding_inst,
-        design_grounding_inst,
+auditors = [compliance_inst, simulation_inst]
+if GROUNDING_ENABLED:
+    auditors.append(grounding_inst)
+
+# Only the design passes the chosen loop layout uses are built; the others stay None
+design_compliance_inst = None
+design_simulation_inst = None
+design_grounding_inst = None
+design_revision_inst = None
+if PARALLEL_AUDITS:
+    # Single design pass over the merged feedback of the parallel audits
+    design_revision_inst = make_design_instance("Revision_Update")
+    sub_update_agents = [
+        design_inst,
+        ParallelAgent(name="Update_Parallel_Audit_Stage", sub_agents=auditors),
+        design_revision_inst,
     ]
 else:
-    logger.debug("Grounding agent DISABLED in design loop.")
+    design_compliance_inst = make_design_instance("Compliance_Update_Review")
+    design_simulation_inst = make_design_instance("Simulation_Update")
+    reflectors = [design_compliance_inst, design_simulation_inst]
+    if GROUNDING_ENABLED:
+        design_grounding_inst = make_design_instance("Grounding_Update")
+        reflectors.append(design_grounding_inst)
+    # Each auditor followed by the design pass that addresses its feedback
+    sub_update_agents = [design_inst]
+    for auditor, reflector in zip(auditors, reflectors):
+        sub_update_agents += [auditor, reflector]
 
 sub_update_agents.append(stop_controller_agent_instance)
 
-review_update_loop = LoopAgent(
-    name="Update_Compliance_Loop",
-    sub_agents=[
-        SequentialAgent(
-            name="Iterative_Update_Stage",
-            sub_agents=sub_update_agents,
-        )
-    ],
-    max_iterations=SAFE_LOOP_ITERS,
-)
-
-json_stop_agent_instance = ProcessAgent(
-    name="JSON_Review_Stop_Controller_Update",
-    model=stop_controller_agent.model,
-    description=stop_controller_agent.description,
-    instruction=stop_controller_agent.instruction,
-    tools=stop_controller_agent.tools,
-    output_key=stop_controller_agent.output_key,
-    before_model_callback=stop_controller_agent.before_model_callback,
-    after_model_callback=stop_controller_agent.after_model_callback,
-)
+# The loop runs its sub-agents in order on every iteration itself, so they are handed
+# to it directly instead of through an intermediate SequentialAgent
+if SEMANTIC_LOOP_STOP:
+    review_update_loop = SemanticStoppingLoop(
+        name="Update_Compliance_Loop",
+        sub_agents=sub_update_agents,
+        max_iterations=SAFE_LOOP_ITERS,
+        similarity_threshold=CONVERGENCE_THRESHOLD,
+        patience=CONVERGENCE_PATIENCE,
+        ready_check=approvals_ready,
+        ready_file=APPROVAL_PATH,
+    )
+else:
+    # No convergence tracking (patience=0), but the approval.json watch still applies
+    review_update_loop = ConvergenceLoop(
+        name="Update_Compliance_Loop",
+        sub_agents=sub_update_agents,
+        max_iterations=SAFE_LOOP_ITERS,
+        patience=0,
+        ready_check=approvals_ready,
+        ready_file=APPROVAL_PATH,
+    )
+
+json_stop_agent_instance = stop_controller_agent.shallow_clone("JSON_Review_Stop_Controller_Update")
 
 json_update_normalization_loop = SequentialAgent(
     name="Update_Normalization_Loop",
     sub_agents=[
-        LoopAgent(
+        StallAwareLoop(
             name="Update_Normalizer_Sequence",
             sub_agents=[normalizer_inst, reviewer_inst, json_stop_agent_instance],
             max_iterations=SAFE_LOOP_ITERS,
+            patience=NORMALIZER_STALL_ROUNDS,
         ),
         writer_inst,
     ],
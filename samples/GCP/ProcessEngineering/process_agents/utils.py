@@ -1,14 +1,19 @@
 # process_agents/utils.py
 import os
+import asyncio
 import json
 import glob
+import hashlib
 import time
 import random
 import re
+import sys
 import traceback
 import logging
 import configparser
-from typing import Any, Union
+import functools
+import threading
+from typing import Any, Callable, List, Union
 
 from typing import Optional
 
@@ -17,6 +22,11 @@ from google.adk.agents import callback_context
 from google.adk.agents.callback_context import CallbackContext
 from google.genai import types
 
+try:
+    import orjson  # optional: much faster JSON for the process/simulation files
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger("ProcessArchitect.Utils")
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -83,8 +93,28 @@ ANSI_HIDDEN = "\033[8m"
 _CACHE: Union[configparser.ConfigParser, None] = None
 PROPERTIES_FILE = os.path.join(PROJECT_ROOT, 'properties', 'agentapp.properties')
 
+# Properties are read once per process; results are memoised per (prop, section, default)
+@functools.lru_cache(maxsize=None)
 def getProperty(prop: str, section: str = 'SETTINGS',
-                default: Union[str, int, float, bool, None] = None) -> Any:
+                default: Union[str, int, float, bool, None] = None,
+                cast: Optional[Callable[[Any], Any]] = None) -> Any:
+    """
+    Returns a property from the properties file (or the environment), converted to
+    bool/int/float where it looks like one. With `cast` (e.g. int, float) the value is
+    also passed through it; values that cannot be cast fall back to cast(default).
+    Results are cached, so the lookup and conversion happen once per argument set.
+    """
+    value = _read_property(prop, section, default)
+    if cast is None or value is None:
+        return value
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        logger.warning("Property %s=%r is not a valid %s; using default %r", prop, value, getattr(cast, "__name__", cast), default)
+        return cast(default) if default is not None else default
+
+def _read_property(prop: str, section: str,
+                   default: Union[str, int, float, bool, None]) -> Any:
     global _CACHE
     if _CACHE is None:
         # One-time disk read with error handling for path
@@ -215,6 +245,57 @@ def getResponseColour(code: str = "responseColourInfo") -> str:
     # 4. Fallback
     return ANSI_RESET
 
+class TokenBucket:
+    """
+    Thread-safe token bucket. acquire() (acquire_async() from a coroutine) returns
+    immediately while tokens are left and only sleeps, for just as long as the next
+    token takes to refill, once the bucket is empty. A non-positive rate disables pacing.
+    """
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1.0
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """Takes one token, sleeping if necessary; returns the time slept."""
+        if self.rate <= 0:
+            return 0.0
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """Like acquire(), but awaits the wait so async tools never block the event loop."""
+        if self.rate <= 0:
+            return 0.0
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+def _model_pacer() -> TokenBucket:
+    try:
+        interval = getProperty("modelSleep", default=0.25, cast=float)
+    except (TypeError, ValueError):
+        interval = 0.25
+    rate = 1.0 / interval if interval > 0 else 0.0
+    return TokenBucket(rate, capacity=getProperty("pacerBurst", default=2, cast=float))
+
+# Shared pacing for tool calls that sit between model calls: on average one call
+# per modelSleep seconds, with short bursts allowed
+MODEL_PACER = _model_pacer()
+
 def _safe_sleep_from_property(name: str, default: float = 0.25):
     pv = getProperty(name, default=default)
     try:
@@ -226,7 +307,7 @@ def _safe_sleep_from_property(name: str, default: float = 0.25):
 def _log_agent_activity(message: str):
     """Internal logging helper."""
     _safe_sleep_from_property("modelSleep", default=0.25)
-    logger.debug(f"--- [DIAGNOSTIC] Utils: {message} ---")
+    logger.debug("--- [DIAGNOSTIC] Utils: %s ---", message)
 
 def _extract_json_brace_balanced(text: str) -> str:
     """
@@ -381,8 +462,9 @@ def _save_raw_data_to_json(json_content) -> str:
 
     def release_lock():
         try:
-            if os.path.exists(lock_path):
-                os.remove(lock_path)
+            os.remove(lock_path)
+        except FileNotFoundError:
+            pass
         except Exception as e:
             logger.error(f"Failed to remove lock file: {e}")
 
@@ -419,8 +501,8 @@ def _save_raw_data_to_json(json_content) -> str:
         parsed = None
         used_repair = False
         try:
-            parsed = json.loads(raw_str)
-        except json.JSONDecodeError as e:
+            parsed = json_loads(raw_str)
+        except json.JSONDecodeError as e:  # orjson's decode error subclasses this
             logger.warning(
                 f"Standard JSON decode failed at char {e.pos}. "
                 f"Attempting structural repair..."
@@ -428,7 +510,7 @@ def _save_raw_data_to_json(json_content) -> str:
             try:
                 from json_repair import repair_json
                 repaired_str = repair_json(raw_str)
-                parsed = json.loads(repaired_str)
+                parsed = json_loads(repaired_str)
                 used_repair = True
                 logger.debug("JSON successfully repaired and loaded.")
             except ImportError:
@@ -482,13 +564,12 @@ def _save_raw_data_to_json(json_content) -> str:
             )
 
         # 5. Final write of clean, repaired JSON
-        clean_json = json.dumps(parsed, indent=2, ensure_ascii=False)
+        clean_json = dumps_json_pretty(parsed)
 
         # Skip write if identical
         if os.path.exists(path):
             try:
-                with open(path, "r", encoding="utf-8") as existing:
-                    old = json.load(existing)
+                old = read_json_file(path)
                 if _json_equal(old, parsed):
                     _log_agent_activity(
                         f"No changes detected; skipping write to {path}."
@@ -499,8 +580,8 @@ def _save_raw_data_to_json(json_content) -> str:
             except Exception:
                 pass  # If comparison fails, fall through to write
 
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(clean_json)
+        with open(path, "wb") as f:
+            f.write(clean_json.encode("utf-8"))
 
         _log_agent_activity(
             f"Successfully saved JSON to {path} "
@@ -521,10 +602,47 @@ def _save_raw_data_to_json(json_content) -> str:
 def _json_equal(a: dict, b: dict) -> bool:
     """Return True if two JSON objects are semantically identical."""
     try:
-        return json.dumps(a, sort_keys=True) == json.dumps(b, sort_keys=True)
+        return canonical_json(a) == canonical_json(b)
     except Exception:
         return False
 
+# ---------------------------------------------------------------------
+# JSON helpers (orjson when installed, stdlib otherwise)
+# ---------------------------------------------------------------------
+def json_loads(data: Union[str, bytes]) -> Any:
+    """json.loads, using orjson when it is available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps_json_pretty(obj: Any) -> str:
+    """2-space indented JSON text with non-ASCII characters kept as-is."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; the stdlib handles those
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+def canonical_json(obj: Any) -> bytes:
+    """Key-sorted compact serialisation, for comparing documents."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False).encode("utf-8")
+
+def read_json_file(path: str) -> Any:
+    """Reads and parses a JSON file; the bytes go straight to the parser."""
+    with open(path, "rb") as f:
+        return json_loads(f.read())
+
+def write_json_file(path: str, obj: Any) -> None:
+    """Writes obj as indented UTF-8 JSON."""
+    with open(path, "wb") as f:
+        f.write(dumps_json_pretty(obj).encode("utf-8"))
+
 # ---------------------------------------------------------------------
 # EXPOSED TOOL (SINGLE ENTRYPOINT FOR LLM)
 # ---------------------------------------------------------------------
@@ -620,21 +738,38 @@ def load_full_process_context() -> dict:
     master_path = os.path.join(PROJECT_ROOT, "output", "process_data.json")
     if os.path.exists(master_path):
         try:
-            with open(master_path, "r", encoding="utf-8") as f:
-                context["master_process"] = json.load(f)
-                context["system_status"] = "OK"
+            context["master_process"] = read_json_file(master_path)
+            context["system_status"] = "OK"
         except Exception as e:
             context["system_status"] = f"ERROR: {e}"
     sub_dir = os.path.join(PROJECT_ROOT, "output", "subprocesses")
     if os.path.exists(sub_dir):
         for file_path in glob.glob(os.path.join(sub_dir, "*.json")):
             try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    context["subprocesses"].append(json.load(f))
+                context["subprocesses"].append(read_json_file(file_path))
             except Exception as e:
                 logger.error(f"Error loading {file_path}: {e}")
     return context
 
+def index_subprocesses(subprocesses: list) -> dict:
+    """Maps each subprocess's parent step_name to its subprocess_flow."""
+    # One step_name lookup per entry (the walrus keeps it for the key)
+    return {
+        step_name: sp.get("subprocess_flow", [])
+        for sp in subprocesses
+        if (step_name := sp.get("step_name"))
+    }
+
+def load_indexed_process_context() -> dict:
+    """
+    load_full_process_context() plus a "subprocess_index" built once at load time.
+    Used by the web app; the agents keep calling load_full_process_context so the
+    model is not sent the subprocess data twice.
+    """
+    context = load_full_process_context()
+    context["subprocess_index"] = index_subprocesses(context["subprocesses"])
+    return context
+
 # Tool to load iteration feedback from output/iteration_feedback.json
 def load_iteration_feedback(reset_data: bool = True) -> dict:
     """
@@ -647,32 +782,77 @@ def load_iteration_feedback(reset_data: bool = True) -> dict:
 
     path = os.path.join(PROJECT_ROOT, "output", "iteration_feedback.json")
     if os.path.exists(path):
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                json_content = f.read().strip()
-                logger.debug(f"Loaded iteration feedback: {str(json_content)[:200]}")
-                feedback = json.loads(json_content)
-        except Exception as e:
-            logger.error(f"Error loading feedback file: {e}")
-            return {"status": "No feedback found", "data": []}
-
-        if reset_data and isinstance(feedback, dict):
+        # Read and reset as one step, so feedback an auditor saves in between is not wiped
+        with _FEEDBACK_LOCK:
             try:
-                feedback_reset = feedback.copy()
-                feedback_reset["data"] = []
-                with open(path, "w", encoding="utf-8") as f:
-                    json.dump(feedback_reset, f, indent=2)
+                with open(path, "r", encoding="utf-8") as f:
+                    json_content = f.read().strip()
+                    logger.debug("Loaded iteration feedback: %.200s", json_content)
+                    feedback = json.loads(json_content)
             except Exception as e:
-                logger.error(f"Error resetting feedback file: {e}")
+                logger.error(f"Error loading feedback file: {e}")
+                return {"status": "No feedback found", "data": []}
+
+            if reset_data and isinstance(feedback, dict):
+                try:
+                    feedback_reset = feedback.copy()
+                    feedback_reset["data"] = []
+                    with open(path, "w", encoding="utf-8") as f:
+                        json.dump(feedback_reset, f, indent=2)
+                except Exception as e:
+                    logger.error(f"Error resetting feedback file: {e}")
 
         return feedback
 
     return {}
 
-def save_iteration_feedback(feedback_data: Any):
+# Serialises the read-modify-write of iteration_feedback.json / approval.json; the
+# auditors can run concurrently (enableParallelAudits) and tools run on worker threads
+_FEEDBACK_LOCK = threading.Lock()
+
+def _as_feedback_list(data: Any) -> list:
+    if data in (None, [], {}, ""):
+        return []
+    return list(data) if isinstance(data, list) else [data]
+
+def _in_parallel_branch(tool_context: Any) -> bool:
+    """True when the calling agent runs in a ParallelAgent branch (the parallel audit stages)."""
+    ctx = getattr(tool_context, "_invocation_context", None)
+    return bool(getattr(ctx, "branch", None))
+
+def _merge_pending_feedback(path: str, payload: dict) -> dict:
+    """
+    Folds feedback that the design agent has not yet consumed (load_iteration_feedback
+    empties "data" once read) into the new payload, so auditors writing in the same
+    parallel round do not overwrite each other. Any pending revision request keeps the
+    combined status at REVISION REQUIRED.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            pending = json.load(f)
+    except (OSError, ValueError):
+        return payload
+    if not isinstance(pending, dict):
+        return payload
+
+    pending_data = _as_feedback_list(pending.get("data"))
+    if not pending_data:
+        return payload
+
+    status = payload["status"]
+    if pending.get("status") == "REVISION REQUIRED":
+        status = "REVISION REQUIRED"
+    return {
+        "status": status,
+        "data": pending_data + _as_feedback_list(payload["data"]),
+    }
+
+def save_iteration_feedback(feedback_data: Any, tool_context: ToolContext = None):
     """
     Saves iteration feedback to disk.
     Corrects the double-nesting issue and extracts status from agent payloads.
+    Each call replaces the previous feedback, except inside a parallel audit stage,
+    where the auditors' feedback for the round is merged (_merge_pending_feedback).
     """
     _log_agent_activity(f"Persisting iteration feedback of type {type(feedback_data)} to disk...")
     _safe_sleep_from_property("modelSleep", default=0.25)
@@ -718,20 +898,21 @@ def save_iteration_feedback(feedback_data: Any):
 
     if matched:
         approval_path = os.path.join(output_dir, "approval.json")
-        approval_state = {}
-        if os.path.exists(approval_path):
-            try:
-                with open(approval_path, "r", encoding="utf-8") as f:
-                    approval_state = json.load(f)
-            except Exception:
-                pass
+        with _FEEDBACK_LOCK:
+            approval_state = {}
+            if os.path.exists(approval_path):
+                try:
+                    with open(approval_path, "r", encoding="utf-8") as f:
+                        approval_state = json.load(f)
+                except Exception:
+                    pass
 
-        for marker in matched:
-            key, value = approval_markers[marker]
-            approval_state[key] = value
+            for marker in matched:
+                key, value = approval_markers[marker]
+                approval_state[key] = value
 
-        with open(approval_path, "w", encoding="utf-8") as f:
-            json.dump(approval_state, f, indent=2)
+            with open(approval_path, "w", encoding="utf-8") as f:
+                json.dump(approval_state, f, indent=2)
 
     # --- 4. Determine top-level status ---
     status = "REVISION REQUIRED"
@@ -761,12 +942,15 @@ def save_iteration_feedback(feedback_data: Any):
 
     # --- 7. Save to disk ---
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            logger.debug(f"Loaded iteration feedback: {str(payload)[:400]}")
-            json.dump(payload, f, indent=2)
+        with _FEEDBACK_LOCK:
+            if _in_parallel_branch(tool_context):
+                payload = _merge_pending_feedback(path, payload)
+            with open(path, "w", encoding="utf-8") as f:
+                logger.debug("Loaded iteration feedback: %.400s", payload)
+                json.dump(payload, f, indent=2)
         
-        logger.debug(f"Iteration feedback saved with status '{status}'.")
-        logger.debug(f"--- [DIAGNOSTIC] Utils: Feedback successfully saved to disk ---")
+        logger.debug("Iteration feedback saved with status '%s'.", status)
+        logger.debug("--- [DIAGNOSTIC] Utils: Feedback successfully saved to disk ---")
         return f"SUCCESS: Feedback persisted to {path}"
 
     except Exception as e:
@@ -784,7 +968,7 @@ def _load_template_json(template_path: str) -> Optional[dict]:
 
     if os.path.exists(template_path):
         try:
-            logger.debug(f"Loading template JSON from {template_path}...")
+            logger.debug("Loading template JSON from %s...", template_path)
             with open(template_path, "r", encoding="utf-8") as f:
                 template_data = json.load(f)
             # Validate template data before returning
@@ -809,6 +993,10 @@ def load_process_template() -> Optional[dict]:
     template_path = os.path.join(PROJECT_ROOT, "process_agents/templates/", "process_schema.json")
     return _load_template_json(template_path)
 
+# Last valid process_data.json, keyed by a hash of its bytes (a rewrite within one mtime
+# tick can keep the size); treat the cached dict as read-only
+_MASTER_JSON_CACHE = {"key": None, "data": None}
+
 # Load the master process JSON from output/process_data.json
 def load_master_process_json() -> Union[dict, None]:
     """
@@ -832,22 +1020,32 @@ def load_master_process_json() -> Union[dict, None]:
         time.sleep(0.1)
 
     # File existence
-    if not os.path.exists(path):
+    try:
+        os.stat(path)
+    except FileNotFoundError:
         logger.warning(f"{path} does not exist. Attempting to load template file {template_path}.")
         return _load_template_json(template_path)
+    except OSError as e:
+        logger.error(f"Unexpected error loading {path}: {e}")
+        return None
 
     try:
         # Read file content
-        with open(path, "r", encoding="utf-8") as f:
-            raw = f.read().strip()
+        with open(path, "rb") as f:
+            raw = f.read()
 
-        if not raw:
+        if not raw.strip():
             logger.error(f"{path} is empty on disk.")
             return None
 
+        # Unchanged since the last successful load: skip the parse and validation
+        cache_key = hashlib.blake2b(raw, digest_size=16).digest()
+        if _MASTER_JSON_CACHE["key"] == cache_key:
+            return _MASTER_JSON_CACHE["data"]
+
         # Parse JSON
         try:
-            data = json.loads(raw)
+            data = json_loads(raw)
         except Exception as e:
             logger.error(f"Failed to parse JSON in {path}: {e}")
             return None
@@ -862,6 +1060,7 @@ def load_master_process_json() -> Union[dict, None]:
             logger.error(f"Validation issues found in {path}: {issues}")
             return None
 
+        _MASTER_JSON_CACHE.update(key=cache_key, data=data)
         return data
 
     except Exception as e:
@@ -869,14 +1068,59 @@ def load_master_process_json() -> Union[dict, None]:
         return None
 
 # Load instruction from a file in the instructions directory
+INSTRUCTIONS_DIR = os.path.join(PROJECT_ROOT, "instructions")
+# Instruction text read ahead by prefetch_instructions(), keyed by file name
+_INSTR_CACHE = {}
+
+def _read_instruction(filename: str) -> str:
+    # Interned so every agent (and agent copy) built from the same instruction file,
+    # whether via the prefetch cache or a direct read, references one string object
+    with open(os.path.join(INSTRUCTIONS_DIR, filename), "r", encoding="utf-8") as f:
+        return sys.intern(f.read())
+
+def prefetch_instructions(filenames: Optional[list] = None) -> None:
+    """
+    Reads instruction files concurrently into the cache used by load_instruction, so
+    the many agents built at import time do not each wait on a serial disk read.
+    Defaults to every .txt file in the instructions directory. Files that cannot be
+    read are skipped here and reported by load_instruction as before.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if filenames is None:
+        try:
+            filenames = [
+                entry.name for entry in os.scandir(INSTRUCTIONS_DIR)
+                if entry.is_file() and entry.name.endswith(".txt")
+            ]
+        except OSError:
+            return
+    pending = [name for name in filenames if name not in _INSTR_CACHE]
+    if not pending:
+        return
+
+    def _try_read(name: str):
+        try:
+            return name, _read_instruction(name)
+        except (OSError, UnicodeDecodeError):
+            return name, None
+
+    with ThreadPoolExecutor(max_workers=min(8, len(pending))) as pool:
+        for name, text in pool.map(_try_read, pending):
+            if text is not None:
+                _INSTR_CACHE[name] = text
+
+@functools.lru_cache(maxsize=None)
 def load_instruction(filename: str) -> str:
-    _log_agent_activity(f"Loading instruction from {filename}")
+    # Prefetched text first; reading instructions is local I/O, so no modelSleep pacing
+    instruction = _INSTR_CACHE.get(filename)
+    if instruction is not None:
+        return instruction
+    logger.debug("--- [DIAGNOSTIC] Utils: Loading instruction from %s ---", filename)
     try:
-        instruction_path = os.path.join(PROJECT_ROOT, "instructions", filename)
-        with open(instruction_path, "r", encoding="utf-8") as f:
-            instruction = f.read()
-            logger.debug(f"Instruction content: {instruction[:100]}...")  # Log first 100 chars
-            return instruction
+        instruction = _read_instruction(filename)
+        logger.debug("Instruction content: %.100s...", instruction)  # Log first 100 chars
+        return instruction
     except FileNotFoundError:
         logger.error(f"Instruction file {filename} not found.")
         raise
@@ -884,7 +1128,16 @@ def load_instruction(filename: str) -> str:
         logger.error(f"Error loading instruction file {filename}: {e}")
         raise
 
+def invalidate_instruction_cache() -> None:
+    """Forgets all loaded and prefetched instruction text, e.g. after editing instruction files."""
+    load_instruction.cache_clear()
+    _INSTR_CACHE.clear()
+
+# Instruction file mtimes recorded after the last successful validation
+INSTRUCTION_CACHE_FILE = os.path.join(PROJECT_ROOT, "output", ".instr_cache.json")
+
 # Validate that all required instruction files exist and are readable
+
 def validate_instruction_files() -> bool:
     """
     Validates that all instruction files exist and are readable.
@@ -909,6 +1162,24 @@ def validate_instruction_files() -> bool:
         "update_analysis_agent.txt"
     ]
 
+    # Warm start: if every file still has the mtime recorded after the last successful
+    # validation, skip opening them again
+    try:
+        mtimes = {
+            filename: os.stat(os.path.join(instruction_dir, filename)).st_mtime_ns
+            for filename in required_files
+        }
+    except OSError:
+        mtimes = None
+    if mtimes is not None:
+        try:
+            with open(INSTRUCTION_CACHE_FILE, "r", encoding="utf-8") as f:
+                if json.load(f) == mtimes:
+                    logger.debug("Instruction files unchanged since last validation.")
+                    return True
+        except (OSError, ValueError):
+            pass
+
     missing = []
     unreadable = []
 
@@ -933,6 +1204,13 @@ def validate_instruction_files() -> bool:
         return False
     else:
         _log_agent_activity("All instruction files validated successfully.")
+        if mtimes is not None:
+            try:
+                os.makedirs(os.path.dirname(INSTRUCTION_CACHE_FILE), exist_ok=True)
+                with open(INSTRUCTION_CACHE_FILE, "w", encoding="utf-8") as f:
+                    json.dump(mtimes, f)
+            except OSError as e:
+                logger.debug("Could not write instruction validation cache: %s", e)
         return True
 
 # ---------------------------------------------------------------------
@@ -940,25 +1218,43 @@ def validate_instruction_files() -> bool:
 # ---------------------------------------------------------------------
 import re
 
+# Patterns used by _clean_text, compiled once
+_CONTEXT_PREFIX_RE = re.compile(r"(?m)^For context:\s*")
+_TOOL_CALL_RE = re.compile(r"(?m)^\[.*?\]\s*called tool `.*?` with parameters:.*\n?")
+_TOOL_RESULT_RE = re.compile(r"(?m)^\[.*?\]\s*`.*?` tool returned result:.*\n?")
+_SAID_PREFIX_RE = re.compile(r"(?m)^\[.*?\]\s*said:\s*")
+_FENCE_RE = re.compile(r"```[a-zA-Z]*\n?")
+# Every pattern above needs one of these substrings to match; text without any of
+# them (most model turns) skips the regex passes entirely
+_CLEAN_TRIGGERS = ("For context:", "called tool `", "tool returned result:", "said:", "```")
+
+@functools.lru_cache(maxsize=256)
 def _clean_text(text: str) -> str:
+    """
+    Cached: the callbacks below re-clean the whole conversation history on
+    every model call, so the same strings come through again and again.
+    """
     if not text:
         return ""
 
+    if not any(trigger in text for trigger in _CLEAN_TRIGGERS):
+        return text.strip()
+
     # 1. Strip "For context:" prefix from the start of any line
     # (?m) enables multiline mode so ^ matches the start of every line
-    text = re.sub(r"(?m)^For context:\s*", "", text)
+    text = _CONTEXT_PREFIX_RE.sub("", text)
 
     # 2. Strip ADK tool traces
     # Remove system metadata lines entirely (called tool / returned result)
-    text = re.sub(r"(?m)^\[.*?\]\s*called tool `.*?` with parameters:.*\n?", "", text)
-    text = re.sub(r"(?m)^\[.*?\]\s*`.*?` tool returned result:.*\n?", "", text)
+    text = _TOOL_CALL_RE.sub("", text)
+    text = _TOOL_RESULT_RE.sub("", text)
     
     # Remove only the prefix for "said:" to keep the actual message content
-    text = re.sub(r"(?m)^\[.*?\]\s*said:\s*", "", text)
+    text = _SAID_PREFIX_RE.sub("", text)
 
     # 3. Strip markdown fences
     # Remove opening fences (e.g., ```json) and closing fences
-    text = re.sub(r"```[a-zA-Z]*\n?", "", text)
+    text = _FENCE_RE.sub("", text)
     text = text.replace("```", "")
 
     return text.strip()
@@ -978,22 +1274,31 @@ STATUS_MARKERS = [
 def _is_status_marker(text: str) -> bool:
     return any(marker in text for marker in STATUS_MARKERS)
 
+_CALLBACK_ATTRS = (
+    "agent_name", "agent_id", "pipeline_name", "stage_name",
+    "metadata", "tool_name", "error_code", "error_message",
+)
+
 
 # ---------------------------------------------------------------------
 # BEFORE MODEL: scrub messages text (for logs / downstream agents)
 # ---------------------------------------------------------------------
 
-def review_messages(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
-    # Collect available context attributes and log them in a single debug call
+def _callback_attrs(callback_context: CallbackContext) -> List[str]:
     attrs = []
-    for attr in ["agent_name", "agent_id", "pipeline_name", "stage_name", "metadata", "tool_name", "error_code", "error_message"]:
+    for attr in _CALLBACK_ATTRS:
         val = getattr(callback_context, attr, None)
         if val:
             attrs.append(f"{attr.upper()}: {val}")
-    if attrs:
-        error_code = getattr(callback_context, "error_code", None)
-        error_message = getattr(callback_context, "error_message", None)
-        logger.debug(f"--- [DIAGNOSTIC] Utils: Reviewing messages with context | {' | '.join(attrs)} ---")
+    return attrs
+
+def review_messages(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    # Collect available context attributes and log them in a single debug call
+    # (skipped entirely unless DEBUG is on: this runs before every model call)
+    if logger.isEnabledFor(logging.DEBUG):
+        attrs = _callback_attrs(callback_context)
+        if attrs:
+            logger.debug(f"--- [DIAGNOSTIC] Utils: Reviewing messages with context | {' | '.join(attrs)} ---")
 
     if not llm_request or not getattr(llm_request, "contents", None):
         return None
@@ -1019,15 +1324,10 @@ def review_messages(callback_context: CallbackContext, llm_request: LlmRequest)
 # ---------------------------------------------------------------------
 def review_outputs(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
     # Collect available context attributes and log them in a single debug call
-    attrs = []
-    for attr in ["agent_name", "agent_id", "pipeline_name", "stage_name", "metadata", "tool_name", "error_code", "error_message"]:
-        val = getattr(callback_context, attr, None)
-        if val:
-            attrs.append(f"{attr.upper()}: {val}")
-    if attrs and llm_response:
-        error_code = getattr(llm_response, "error_code", None)
-        error_message = getattr(llm_response, "error_message", None)
-        logger.debug(f"--- [DIAGNOSTIC] Utils: Reviewing outputs with context | {' | '.join(attrs)} {llm_response} ---")
+    if llm_response and logger.isEnabledFor(logging.DEBUG):
+        attrs = _callback_attrs(callback_context)
+        if attrs:
+            logger.debug(f"--- [DIAGNOSTIC] Utils: Reviewing outputs with context | {' | '.join(attrs)} {llm_response} ---")
 
     if not llm_response or not getattr(llm_response, "candidates", None):
         return llm_response
@@ -1053,7 +1353,8 @@ def review_outputs(callback_context: CallbackContext, llm_response: LlmResponse)
 
 class CleanedStdout:
     def __init__(self, path: str):
-        self.file = open(path, "w", encoding="utf-8")
+        # Line-buffered so the log can be followed while the pipeline runs
+        self.file = open(path, "w", encoding="utf-8", buffering=1)
 
     def write(self, text):
         try:
@@ -1079,3 +1380,6 @@ class CleanedStdout:
 
     def flush(self):
         self.file.flush()
+
+    def close(self):
+        self.file.close()
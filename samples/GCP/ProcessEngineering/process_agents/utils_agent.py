@@ -2,44 +2,61 @@
 import logging
 from google.adk.tools.tool_context import ToolContext
 import os
+import hashlib
 import time
-import random
 import json
 import sys
 
-from typing import Any
-
 logger = logging.getLogger("ProcessArchitect.UtilsAgent")
 
 from .utils import (
     getProperty,
+    json_loads,
     CleanedStdout
 )
 
 from .design_agent import design_agent
-from .agent_wrappers import ProcessAgent
+from .agent_wrappers import FunctionAgent
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 
+# Stop-controller settings, resolved once at import rather than on every loop pass
+SAFE_LOOP_ITERS = getProperty("loopIterations", default=2, cast=int)
+# getProperty returns booleans for true/false values; "1"/"yes"/"on" are accepted as well
+HARD_STOP = str(getProperty("loopHardStop", default=False)).lower() in ("1", "true", "yes", "on")
+# Also read by the create/update pipelines, so grounding is switched on or off in one place
+GROUNDING_ENABLED = str(getProperty("enableGroundingAgent", default=True)).lower() in ("1", "true", "yes", "on")
+
 # ---------- Programmatic stop/kill-switch tool ----------
-def _contains_marker(obj: Any, needle: str) -> bool:
-    """Recursive search for case-insensitive needle in dict/list/str."""
-    time.sleep(float(getProperty("modelSleep")) + random.random() * 0.75)
-    if obj is None:
-        return False
-    if isinstance(obj, str):
-        return needle.lower() in obj.lower()
-    if isinstance(obj, dict):
-        return any(_contains_marker(v, needle) for v in obj.values())
-    if isinstance(obj, list):
-        return any(_contains_marker(x, needle) for x in obj)
-    return False
-
-def status_logger(goal_count: int):
-    """Internal tool to track progress."""
-    time.sleep(float(getProperty("modelSleep")) + random.random() * 0.75)
-    logger.debug(f"StopAgent - Logger Goals Identified: {goal_count}.")
-    return f"Logging status with {goal_count} identified objectives."
+APPROVAL_PATH = os.path.join(PROJECT_ROOT, "output", "approval.json")
+# Approvals the design loop needs before it may stop
+REQUIRED_APPROVALS = {
+    "compliance_status": "APPROVED",
+    "simulation_status": "APPROVED",
+    **({"grounding_status": "APPROVED"} if GROUNDING_ENABLED else {}),
+}
+
+# Last parsed approval.json, keyed on a hash of its bytes so it is only re-parsed after a
+# write ("APPROVED" and "REJECTED" have the same length, so size and mtime are not enough)
+_APPROVAL_CACHE = {"key": None, "data": {}}
+
+def _load_approval_state(approval_path: str) -> dict:
+    """Returns the parsed approval.json ({} when missing or unreadable); read-only."""
+    try:
+        with open(approval_path, "rb") as f:
+            raw = f.read()
+    except OSError:
+        return {}
+
+    cache_key = hashlib.blake2b(raw, digest_size=16).digest()
+    if _APPROVAL_CACHE["key"] != cache_key:
+        try:
+            # Raw bytes straight to orjson (stdlib json without it); no text decoding pass
+            data = json_loads(raw)
+        except ValueError:
+            data = {}
+        _APPROVAL_CACHE.update(key=cache_key, data=data)
+    return _APPROVAL_CACHE["data"]
 
 def stop_if_ready(tool_context: ToolContext):
     """
@@ -55,7 +72,6 @@ def stop_if_ready(tool_context: ToolContext):
     # 1. Persistent counter setup
     # ---------------------------------------------------------
     counter_path = os.path.join(PROJECT_ROOT, "output", "stop_counter.json")
-    SAFE_LOOP_ITERS = int(getProperty("loopIterations", default=2))
 
     # Load existing counter
     loop_count = 0
@@ -77,13 +93,12 @@ def stop_if_ready(tool_context: ToolContext):
     except Exception:
         logger.debug("Failed to persist stop counter.")
 
-    logger.debug(f"Stop Controller loop count = {loop_count} / {SAFE_LOOP_ITERS}")
+    logger.debug("Stop Controller loop count = %s / %s", loop_count, SAFE_LOOP_ITERS)
 
     # ---------------------------------------------------------
     # 2. Hard stop override
     # ---------------------------------------------------------
-    hard_stop = str(getProperty("loopHardStop", default=False)).lower() in ("1", "true", "yes", "on")
-    if hard_stop:
+    if HARD_STOP:
         tool_context.actions.escalate = True
         logger.debug("Hard stop condition met via loopHardStop property.")
         _reset_stop_counter(counter_path)
@@ -101,25 +116,11 @@ def stop_if_ready(tool_context: ToolContext):
     # ---------------------------------------------------------
     # 4. Approval-state stop
     # ---------------------------------------------------------
-    approval_path = os.path.join(PROJECT_ROOT, "output", "approval.json")
-    approval_state = {}
-
-    if os.path.exists(approval_path):
-        try:
-            with open(approval_path, "r", encoding="utf-8") as f:
-                approval_state = json.load(f)
-        except Exception:
-            approval_state = {}
-
-    logger.debug(f"Current approval state: {approval_state}")
+    approval_state = _load_approval_state(APPROVAL_PATH)
 
-    required = {
-        "compliance_status": "APPROVED",
-        "simulation_status": "APPROVED",
-    }
+    logger.debug("Current approval state: %s", approval_state)
 
-    if getProperty("enableGroundingAgent", default="true"):
-        required["grounding_status"] = "APPROVED"
+    required = REQUIRED_APPROVALS
 
     if "JSON APPROVED" in approval_state.get("status", "").strip().upper():
         tool_context.actions.escalate = True
@@ -141,26 +142,40 @@ def stop_if_ready(tool_context: ToolContext):
 
     return "Continue with loop — no stop conditions met."
 
+def approvals_ready() -> bool:
+    """
+    True once approval.json carries every required approval (or JSON APPROVED), i.e. the
+    next stop_if_ready call will end the loop. Used by the design loops to skip straight
+    to the stop controller as soon as the approvals land.
+    """
+    approval_state = _load_approval_state(APPROVAL_PATH)
+    if "JSON APPROVED" in approval_state.get("status", "").strip().upper():
+        return True
+    if any(approval_state.get(k) == "JSON APPROVED" for k in REQUIRED_APPROVALS):
+        return True
+    return all(approval_state.get(k) == v for k, v in REQUIRED_APPROVALS.items())
+
 def _reset_stop_counter(counter_path: str):
     """Reset the persistent stop counter."""
     try:
-        if os.path.exists(counter_path):
-            os.remove(counter_path)
-            logger.debug("Stop counter reset.")
-    except Exception:
+        os.remove(counter_path)
+        logger.debug("Stop counter reset.")
+    except OSError:
         pass
 
 # ---------- Minimal controller agent that ALWAYS calls the stop tool ----------
-stop_controller_agent = ProcessAgent(
+# stop_if_ready is deterministic, so it is called directly rather than by a model prompted
+# to call it (stop_controller_agent.txt describes the old tool-calling contract)
+stop_controller_agent = FunctionAgent(
     name="Stop_Controller",
     description="Exits the loop immediately when approvals are complete or kill-switch is set.",
-    instruction_file="stop_controller_agent.txt",
-    tools=[status_logger,stop_if_ready],
+    fn=stop_if_ready,
 )
 
 # ---------- Mute agent to consume injected context silently ----------
 log_dir = "output/logs"
-os.makedirs(log_dir, exist_ok=True)
+# Created on first mute rather than at import
+_log_dir_ready = False
 
 from .utils import (
     ANSI_GREEN, 
@@ -169,33 +184,59 @@ from .utils import (
 
 # Function to kill all console output
 
+# The redirect installed by silence_console and the stream it replaced; both functions
+# are idempotent, so a repeated mute/unmute neither stacks redirects nor leaks the log file
+_muted_stdout = None
+_saved_stdout = None
+
+def _close_muted_stdout():
+    global _muted_stdout, _saved_stdout
+    try:
+        _muted_stdout.close()
+    except OSError:
+        pass
+    _muted_stdout = _saved_stdout = None
+
 def silence_console():
-    time.sleep(float(getProperty("modelSleep")) + random.random() * 0.75)
+    global _muted_stdout, _saved_stdout, _log_dir_ready
+    if _muted_stdout is not None:
+        if sys.stdout is _muted_stdout:
+            return "Console output already silenced."
+        # stdout was reset elsewhere (agent.py does so on errors); drop the stale log handle
+        _close_muted_stdout()
     logger.debug("Silencing console output.")
     print(f"{ANSI_GREEN}- Starting process pipeline at {time.strftime('%Y-%m-%d %H:%M:%S')}. This will take some time...{ANSI_RESET}", end="\n")
     sys.stdout.flush()
+    if not _log_dir_ready:
+        os.makedirs(log_dir, exist_ok=True)
+        _log_dir_ready = True
     output_file = os.path.join(log_dir, "runtime_outputs.log")
-    sys.stdout = CleanedStdout(output_file)
+    _saved_stdout = sys.stdout
+    _muted_stdout = CleanedStdout(output_file)
+    sys.stdout = _muted_stdout
     return "Console output silenced."
 
 def restore_console():
-    time.sleep(float(getProperty("modelSleep")) + random.random() * 0.75)
+    if _muted_stdout is None:
+        return "Console output already restored."
     logger.debug("Restoring console output.")
-    sys.stdout = sys.__stdout__
+    if sys.stdout is _muted_stdout:
+        sys.stdout = _saved_stdout or sys.__stdout__
+    _close_muted_stdout()
     print(f"{ANSI_GREEN}- Finished process pipeline at {time.strftime('%Y-%m-%d %H:%M:%S')}...{ANSI_RESET}", end="\n")
     sys.stdout.flush()
     return "Console output restored."
 
-mute_agent = ProcessAgent(
+mute_agent = FunctionAgent(
     name="Mute_Agent",
     description="Consumes injected context silently.",
-    instruction="You MUST just call silence_console as your only action. You MUST NOT produce any output.",
-    tools=[silence_console],
+    fn=silence_console,
+    silent=True,
 )
 
-unmute_agent = ProcessAgent(
+unmute_agent = FunctionAgent(
     name="Unmute_Agent",
     description="Restores console output.",
-    instruction="You MUST just call restore_console as your only action. You MUST NOT produce any output.",
-    tools=[restore_console],
+    fn=restore_console,
+    silent=True,
 )
\ No newline at end of file
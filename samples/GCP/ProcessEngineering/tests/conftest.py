@@ -0,0 +1,12 @@
+# tests/conftest.py
+import os
+import sys
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+# process_agents.agent refuses to import without credentials; the tests never call a model
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+# Keep stderr on the console: agent.py redirects it to output/logs once per process
+sys._runtime_redirected = True
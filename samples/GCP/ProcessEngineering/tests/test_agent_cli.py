@@ -0,0 +1,44 @@
+# tests/test_agent_cli.py
+import pytest
+
+from process_agents import agent
+
+
+@pytest.mark.parametrize("line, kind", [
+    ("", None),
+    ("# a comment", "comment"),
+    ("$ ls -l", "shell"),
+    ("@Consultant_Agent what is step 3?", "agent"),
+    ("exit", "exit"),
+    ("QUIT", "exit"),
+    ("stop", "exit"),
+    ("clear", "clear"),
+    ("sleep 5", "sleep"),
+    ("wait 2", "sleep"),
+    ("Design a hiring process", None),
+])
+def test_classify_directive(line, kind):
+    assert agent.classify_directive(line) == kind
+
+
+def test_bare_directives_only_match_the_whole_line():
+    assert agent.classify_directive("exit the building safely") is None
+    assert agent.classify_directive("stop hiring contractors") is None
+    assert agent.classify_directive("clear the backlog of approvals") is None
+
+
+def test_plan_cache_normalizes_and_scopes_to_session():
+    cache = agent.PlanCache()
+    cache.put("s1", "Update  the Hiring   process now", "Update_Agent")
+
+    assert cache.get("s1", "update the hiring process NOW") == "Update_Agent"
+    assert cache.get("s2", "update the hiring process now") is None
+
+
+def test_plan_cache_skips_short_lines():
+    cache = agent.PlanCache()
+    short = " ".join(["word"] * (agent.PLAN_CACHE_MIN_WORDS - 1))
+    cache.put("s1", short, "Update_Agent")
+
+    assert not agent.PlanCache.cacheable(agent.PlanCache.normalize(short))
+    assert cache.get("s1", short) is None
@@ -0,0 +1,107 @@
+# tests/test_agent_wrappers.py
+import asyncio
+from typing import AsyncGenerator, List
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from pydantic import PrivateAttr
+
+from process_agents.agent_wrappers import ConvergenceLoop, StallAwareLoop
+
+
+class _WriterAgent(BaseAgent):
+    """Writes the next of `outputs` to `path` on every run (the last one repeats)."""
+    path: str
+    outputs: List[str]
+    escalate_on: int = 0
+    _runs: int = PrivateAttr(default=0)
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        text = self.outputs[min(self._runs, len(self.outputs) - 1)]
+        self._runs += 1
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(text)
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=f"run {self._runs}")]),
+            actions=EventActions(escalate=self._runs == self.escalate_on or None),
+        )
+
+
+def _run(loop) -> None:
+    async def go():
+        runner = InMemoryRunner(agent=loop, app_name="tests")
+        session = await runner.session_service.create_session(app_name="tests", user_id="u")
+        message = types.Content(role="user", parts=[types.Part(text="go")])
+        async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+            pass
+
+    asyncio.run(go())
+
+
+def _loop(cls, tmp_path, outputs, **kwargs):
+    path = str(tmp_path / "process_data.json")
+    writer = _WriterAgent(name="Writer", path=path, outputs=outputs, escalate_on=kwargs.pop("escalate_on", 0))
+    return cls(name="Loop", sub_agents=[writer], watch_file=path, **kwargs), writer
+
+
+def test_stops_once_output_is_stable(tmp_path):
+    loop, writer = _loop(ConvergenceLoop, tmp_path, ["same"], max_iterations=5, patience=1)
+
+    _run(loop)
+
+    assert writer._runs == 2
+
+
+def test_runs_to_the_cap_while_output_changes(tmp_path):
+    loop, writer = _loop(ConvergenceLoop, tmp_path, ["a", "b", "c", "d", "e"], max_iterations=5, patience=1)
+
+    _run(loop)
+
+    assert writer._runs == 5
+
+
+def test_patience_needs_consecutive_stable_rounds(tmp_path):
+    loop, writer = _loop(ConvergenceLoop, tmp_path, ["a", "b", "b", "c", "c", "c"], max_iterations=10, patience=2)
+
+    _run(loop)
+
+    assert writer._runs == 6
+
+
+def test_no_tracking_when_the_cap_leaves_no_room(tmp_path):
+    loop, writer = _loop(ConvergenceLoop, tmp_path, ["same"], max_iterations=2, patience=1)
+
+    _run(loop)
+
+    assert writer._runs == 2
+
+
+def test_patience_zero_disables_tracking(tmp_path):
+    loop, writer = _loop(ConvergenceLoop, tmp_path, ["same"], max_iterations=4, patience=0)
+
+    _run(loop)
+
+    assert writer._runs == 4
+
+
+def test_escalation_still_ends_the_loop(tmp_path):
+    loop, writer = _loop(ConvergenceLoop, tmp_path, ["a", "b", "c"], max_iterations=5, patience=1, escalate_on=2)
+
+    _run(loop)
+
+    assert writer._runs == 2
+
+
+def test_stall_aware_loop_ignores_formatting_and_key_order(tmp_path):
+    outputs = ['{"a": 1, "b": [1, 2]}', '{\n  "b": [1, 2],\n  "a": 1\n}']
+    loop, writer = _loop(StallAwareLoop, tmp_path, outputs, max_iterations=5, patience=1)
+
+    _run(loop)
+
+    assert writer._runs == 2
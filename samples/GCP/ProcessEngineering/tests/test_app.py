@@ -0,0 +1,77 @@
+# tests/test_app.py
+import gzip
+import json
+
+import pytest
+
+from process_agents import app as app_module
+from process_agents import utils
+
+STEPS = [{"step_name": f"Step {i}", "description": "Reviews the request " * 5} for i in range(20)]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    output = tmp_path / "output"
+    (output / "subprocesses").mkdir(parents=True)
+    master = output / "process_data.json"
+    master.write_text(json.dumps({"process_name": "Hiring", "process_steps": STEPS}))
+
+    monkeypatch.setattr(utils, "PROJECT_ROOT", str(tmp_path))
+    monkeypatch.setattr(app_module, "MASTER_FILE", str(master))
+    monkeypatch.setattr(app_module, "SUBPROCESS_DIR", str(output / "subprocesses"))
+    monkeypatch.setattr(app_module, "_PROCESS_CACHE", (None, None, None, None))
+    app_module.app.config["TESTING"] = True
+    with app_module.app.test_client() as test_client:
+        test_client.master = master
+        yield test_client
+
+
+def test_api_process_serves_the_model(client):
+    response = client.get("/api/process")
+
+    assert response.status_code == 200
+    body = json.loads(response.data)
+    assert body["process_name"] == "Hiring"
+    assert len(body["level1_steps"]) == len(STEPS)
+    assert response.headers["ETag"]
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+
+def test_api_process_not_modified(client):
+    etag = client.get("/api/process").headers["ETag"]
+
+    response = client.get("/api/process", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.data == b""
+
+
+def test_api_process_gzip_from_cache(client):
+    plain = client.get("/api/process")
+    # The first response is streamed; the payload is cached once it has been read
+    plain_body = plain.data
+
+    response = client.get("/api/process", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data) == plain_body
+    assert response.headers["ETag"].strip('"') == plain.headers["ETag"].strip('"') + "-gz"
+
+    revalidated = client.get(
+        "/api/process",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]},
+    )
+    assert revalidated.status_code == 304
+
+
+def test_api_process_etag_follows_the_files(client):
+    first = client.get("/api/process")
+    client.master.write_text(json.dumps({"process_name": "Onboarding", "process_steps": STEPS}))
+
+    second = client.get("/api/process", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert second.status_code == 200
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert json.loads(second.data)["process_name"] == "Onboarding"
@@ -0,0 +1,126 @@
+# tests/test_utils.py
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from process_agents import utils
+
+
+# ---------------------------------------------------------
+# TokenBucket
+# ---------------------------------------------------------
+def test_token_bucket_bursts_then_paces(monkeypatch):
+    slept = []
+    monkeypatch.setattr(utils.time, "sleep", slept.append)
+    bucket = utils.TokenBucket(rate=10.0, capacity=2)
+
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    wait = bucket.acquire()
+
+    assert 0.0 < wait <= 0.1
+    assert slept == [wait]
+
+
+def test_token_bucket_disabled_with_non_positive_rate(monkeypatch):
+    monkeypatch.setattr(utils.time, "sleep", lambda _: pytest.fail("should not sleep"))
+    bucket = utils.TokenBucket(rate=0.0)
+
+    assert [bucket.acquire() for _ in range(5)] == [0.0] * 5
+
+
+def test_token_bucket_acquire_async_awaits_instead_of_blocking():
+    bucket = utils.TokenBucket(rate=50.0, capacity=1)
+
+    async def take_two():
+        return await bucket.acquire_async(), await bucket.acquire_async()
+
+    first, second = asyncio.run(take_two())
+    assert first == 0.0
+    assert 0.0 < second <= 0.02
+
+
+# ---------------------------------------------------------
+# getProperty(cast=...)
+# ---------------------------------------------------------
+@pytest.fixture
+def fresh_properties():
+    utils.getProperty.cache_clear()
+    yield
+    utils.getProperty.cache_clear()
+
+
+def test_get_property_cast(monkeypatch, fresh_properties):
+    monkeypatch.setenv("TEST_CAST_PROP", "7")
+
+    assert utils.getProperty("TEST_CAST_PROP") == 7
+    assert utils.getProperty("TEST_CAST_PROP", cast=float) == 7.0
+    assert isinstance(utils.getProperty("TEST_CAST_PROP", cast=str), str)
+
+
+def test_get_property_cast_falls_back_to_default(monkeypatch, fresh_properties):
+    monkeypatch.setenv("TEST_CAST_PROP", "not-a-number")
+
+    assert utils.getProperty("TEST_CAST_PROP", default=3, cast=int) == 3
+    assert utils.getProperty("TEST_CAST_PROP_MISSING", default=2, cast=float) == 2.0
+    assert utils.getProperty("TEST_CAST_PROP_MISSING", cast=int) is None
+
+
+# ---------------------------------------------------------
+# Iteration feedback
+# ---------------------------------------------------------
+def test_merge_pending_feedback_without_pending_file(tmp_path):
+    payload = {"status": "COMPLIANCE APPROVED", "data": []}
+
+    assert utils._merge_pending_feedback(str(tmp_path / "missing.json"), payload) is payload
+
+
+def test_merge_pending_feedback_keeps_unconsumed_entries(tmp_path):
+    path = tmp_path / "iteration_feedback.json"
+    path.write_text(json.dumps({"status": "REVISION REQUIRED", "data": [{"issue": "a"}]}))
+
+    merged = utils._merge_pending_feedback(
+        str(path), {"status": "SIMULATION_ALL_APPROVED", "data": {"issue": "b"}}
+    )
+
+    assert merged == {"status": "REVISION REQUIRED", "data": [{"issue": "a"}, {"issue": "b"}]}
+
+
+def test_merge_pending_feedback_ignores_consumed_feedback(tmp_path):
+    path = tmp_path / "iteration_feedback.json"
+    path.write_text(json.dumps({"status": "REVISION REQUIRED", "data": []}))
+    payload = {"status": "COMPLIANCE APPROVED", "data": [{"issue": "b"}]}
+
+    assert utils._merge_pending_feedback(str(path), payload) is payload
+
+
+@pytest.fixture
+def feedback_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "PROJECT_ROOT", str(tmp_path))
+    monkeypatch.setattr(utils, "_safe_sleep_from_property", lambda *args, **kwargs: None)
+    return tmp_path / "output"
+
+
+def _branch_context(branch):
+    return SimpleNamespace(_invocation_context=SimpleNamespace(branch=branch))
+
+
+def test_save_iteration_feedback_overwrites_outside_parallel_stage(feedback_root):
+    utils.save_iteration_feedback({"status": "REVISION REQUIRED", "issues": ["a"]})
+    utils.save_iteration_feedback({"status": "REVISION REQUIRED", "issues": ["b"]}, tool_context=_branch_context(None))
+
+    saved = json.loads((feedback_root / "iteration_feedback.json").read_text())
+    assert saved == {"status": "REVISION REQUIRED", "data": ["b"]}
+
+
+def test_save_iteration_feedback_merges_inside_parallel_stage(feedback_root):
+    branch = _branch_context("Parallel_Audit_Stage.Compliance_Review_Agent")
+    utils.save_iteration_feedback({"status": "REVISION REQUIRED", "issues": ["a"]}, tool_context=branch)
+    utils.save_iteration_feedback({"status": "SIMULATION_ALL_APPROVED", "issues": ["b"]}, tool_context=branch)
+
+    saved = json.loads((feedback_root / "iteration_feedback.json").read_text())
+    assert saved == {"status": "REVISION REQUIRED", "data": ["a", "b"]}
+    approvals = json.loads((feedback_root / "approval.json").read_text())
+    assert approvals == {"simulation_status": "APPROVED"}
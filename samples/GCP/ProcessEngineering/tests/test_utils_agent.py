@@ -0,0 +1,103 @@
+# tests/test_utils_agent.py
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+from google.adk.events import EventActions
+
+from process_agents import utils_agent
+
+
+@pytest.fixture
+def approval_dir(tmp_path, monkeypatch):
+    output = tmp_path / "output"
+    output.mkdir()
+    monkeypatch.setattr(utils_agent, "PROJECT_ROOT", str(tmp_path))
+    monkeypatch.setattr(utils_agent, "APPROVAL_PATH", str(output / "approval.json"))
+    monkeypatch.setattr(utils_agent, "SAFE_LOOP_ITERS", 5)
+    monkeypatch.setattr(utils_agent, "HARD_STOP", False)
+    monkeypatch.setattr(utils_agent, "REQUIRED_APPROVALS", {
+        "compliance_status": "APPROVED",
+        "simulation_status": "APPROVED",
+    })
+    monkeypatch.setattr(utils_agent, "_APPROVAL_CACHE", {"key": None, "data": {}})
+    return output
+
+
+def _write_approvals(output, **state):
+    (output / "approval.json").write_text(json.dumps(state))
+
+
+def _tool_context():
+    return SimpleNamespace(actions=EventActions())
+
+
+def test_approvals_ready_needs_every_required_approval(approval_dir):
+    assert not utils_agent.approvals_ready()
+
+    _write_approvals(approval_dir, compliance_status="APPROVED")
+    assert not utils_agent.approvals_ready()
+
+    _write_approvals(approval_dir, compliance_status="APPROVED", simulation_status="APPROVED")
+    assert utils_agent.approvals_ready()
+
+
+def test_approvals_ready_on_json_approved(approval_dir):
+    _write_approvals(approval_dir, status="JSON APPROVED")
+
+    assert utils_agent.approvals_ready()
+
+
+def test_approval_cache_sees_same_size_rewrites(approval_dir):
+    path = approval_dir / "approval.json"
+    _write_approvals(approval_dir, compliance_status="APPROVED", simulation_status="REJECTED")
+    stat = os.stat(path)
+    assert not utils_agent.approvals_ready()
+
+    # Same length, same mtime: only the content tells the two apart
+    _write_approvals(approval_dir, compliance_status="APPROVED", simulation_status="APPROVED")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert os.stat(path).st_size == stat.st_size
+    assert utils_agent.approvals_ready()
+
+
+def test_stop_if_ready_continues_without_approvals(approval_dir):
+    tool_context = _tool_context()
+
+    result = utils_agent.stop_if_ready(tool_context)
+
+    assert result.startswith("Continue")
+    assert not tool_context.actions.escalate
+    assert json.loads((approval_dir / "stop_counter.json").read_text()) == {"count": 1}
+
+
+def test_stop_if_ready_escalates_on_approvals(approval_dir):
+    _write_approvals(approval_dir, compliance_status="APPROVED", simulation_status="APPROVED")
+    tool_context = _tool_context()
+
+    utils_agent.stop_if_ready(tool_context)
+
+    assert tool_context.actions.escalate
+    assert not (approval_dir / "stop_counter.json").exists()
+
+
+def test_stop_if_ready_escalates_at_the_iteration_cap(approval_dir, monkeypatch):
+    monkeypatch.setattr(utils_agent, "SAFE_LOOP_ITERS", 2)
+    first, second = _tool_context(), _tool_context()
+
+    utils_agent.stop_if_ready(first)
+    utils_agent.stop_if_ready(second)
+
+    assert not first.actions.escalate
+    assert second.actions.escalate
+    assert not (approval_dir / "stop_counter.json").exists()
+
+
+def test_stop_if_ready_hard_stop(approval_dir, monkeypatch):
+    monkeypatch.setattr(utils_agent, "HARD_STOP", True)
+    tool_context = _tool_context()
+
+    utils_agent.stop_if_ready(tool_context)
+
+    assert tool_context.actions.escalate